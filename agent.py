@@ -2,25 +2,50 @@
 AI Agent for job scraping using CrewAI.
 Professional implementation with improved prompting and error handling.
 """
-import json
+import re
 import ast
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any, Optional
+import orjson
+from pydantic import ValidationError
 from crewai import Agent, Task, Crew, Process
 from crewai_tools import ScrapeWebsiteTool
+from bs4 import BeautifulSoup
 
-from models import JobListing, JobSearchResult
+from models import JobListing, JobSearchResult, JOB_LIST_ADAPTER
+from ats_adapters import get_ats_adapter
 from scraper_utils import (
     retry_with_backoff,
     rate_limiter,
     circuit_breaker,
     scrape_cache,
     extract_domain,
-    normalize_url
+    normalize_url,
+    compile_keyword_pattern,
+    get_default_headers,
+    get_http_client,
+    matches_role,
+    LRUCache
 )
 
 logger = logging.getLogger(__name__)
 
+# Whitespace cleanup applied to scraped page text
+_INLINE_SPACE_RE = re.compile(r"[ \t]+")
+_BLANK_LINES_RE = re.compile(r"\s+\n\s+")
+
+# Greedy match from the first '[' to the last ']' in the LLM output
+_JSON_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+
+# Brackets and JSON string literals; strings are matched whole so brackets inside them are skipped
+_JSON_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]]')
+
+# Parsed (jobs, parsing_errors) keyed by base URL + raw JSON text, so retried identical output is free
+parse_cache = LRUCache(max_size=64, ttl_seconds=1800)
+
 
 # Enhanced few-shot examples for better LLM output
 FEW_SHOT_EXAMPLES = """
@@ -62,6 +87,92 @@ CRITICAL TITLE RULES:
 """
 
 
+# Static extraction rules, sent once as part of the agent's backstory rather than in every task
+VALIDATION_CHECKLIST = """
+VALIDATION CHECKLIST (verify before responding):
+✓ Every "url" field contains an actual URL path, not "Apply Now"
+✓ Every "title" field is a real job title
+✓ Output is valid JSON array (no markdown, no explanation)
+✓ Empty array [] if no matching jobs found
+"""
+
+AGENT_BACKSTORY = (
+    "You are an elite technical recruiter with 15 years of experience parsing "
+    "every major ATS system: Greenhouse, Lever, Workday, Ashby, and custom career sites. "
+    "You have an exceptional eye for detail and NEVER confuse button text with URLs. "
+    "You always return perfectly structured JSON and validate your output before submitting.\n"
+    + FEW_SHOT_EXAMPLES
+    + VALIDATION_CHECKLIST
+)
+
+
+# Task description skeleton, built once; only per-target values are filled in with format_map
+TASK_TEMPLATE = """
+            MISSION: Extract job listings from {company_name}'s careers page.
+            
+            TARGET URL: {careers_url}
+            TARGET ROLE: "{role_keyword}"
+            
+            STEP-BY-STEP PROCESS:
+            1. Scrape the careers page content at the TARGET URL
+            2. Identify ALL job postings that match or relate to "{role_keyword}"
+            3. Include variations: "Senior {role_keyword}", "Staff {role_keyword}", "{role_keyword} II", etc.
+            4. Extract the EXACT href URL from each job's link (NOT button text!)
+            5. Extract location, handling "Remote", "Hybrid", or specific cities
+            6. Extract posting date if visible (any format is acceptable)
+            {exclusion_text}
+            {location_text}
+            
+            OUTPUT FORMAT - Return ONLY a JSON array:
+            [
+              {{"title": "Job Title", "url": "/path/to/job", "location": "City, State", "posted_date": "Jan 15"}},
+              ...
+            ]
+            
+            RESPOND WITH JSON ONLY - NO EXPLANATIONS
+            """
+
+
+class PooledScrapeWebsiteTool(ScrapeWebsiteTool):
+    """ScrapeWebsiteTool that fetches through the shared keep-alive HTTP client."""
+    
+    def _run(self, **kwargs: Any) -> str:
+        website_url = kwargs.get('website_url', self.website_url)
+        response = get_http_client().get(
+            website_url,
+            headers=get_default_headers(),
+            cookies=self.cookies or None
+        )
+        text = BeautifulSoup(response.text, "html.parser").get_text(" ")
+        text = _INLINE_SPACE_RE.sub(" ", text)
+        return _BLANK_LINES_RE.sub("\n", text)
+
+
+def _find_json_array(text: str) -> Optional[str]:
+    """
+    Extract the first complete JSON array from LLM output.
+    Stops as soon as the bracket depth returns to zero, so trailing explanations
+    (even ones containing brackets) are ignored. Falls back to a greedy match
+    when the brackets never balance.
+    """
+    start_idx = text.find('[')
+    if start_idx == -1:
+        return None
+    
+    depth = 0
+    for token in _JSON_TOKEN_RE.finditer(text, start_idx):
+        char = token.group(0)
+        if char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+            if depth == 0:
+                return text[start_idx:token.end()]
+    
+    match = _JSON_ARRAY_RE.search(text, start_idx)
+    return match.group(0) if match else None
+
+
 class JobScraperAgent:
     """
     Professional job scraping agent using CrewAI.
@@ -70,19 +181,14 @@ class JobScraperAgent:
     
     def __init__(self, llm):
         self.llm = llm
-        self._agent = None
+        self._local = threading.local()
     
     def _create_agent(self, scraper_tool: ScrapeWebsiteTool) -> Agent:
         """Create a configured recruiter agent."""
         return Agent(
             role='Expert Technical Recruiter & Job Board Analyst',
             goal='Extract ALL job listings from career pages with 100% accuracy',
-            backstory=(
-                "You are an elite technical recruiter with 15 years of experience parsing "
-                "every major ATS system: Greenhouse, Lever, Workday, Ashby, and custom career sites. "
-                "You have an exceptional eye for detail and NEVER confuse button text with URLs. "
-                "You always return perfectly structured JSON and validate your output before submitting."
-            ),
+            backstory=AGENT_BACKSTORY,
             tools=[scraper_tool],
             llm=self.llm,
             verbose=True,
@@ -111,42 +217,43 @@ class JobScraperAgent:
             location_text = f"\n- PRIORITIZE locations: {', '.join(include_locations)}"
         
         return Task(
-            description=f"""
-            MISSION: Extract job listings from {company_name}'s careers page.
-            
-            TARGET URL: {careers_url}
-            TARGET ROLE: "{role_keyword}"
-            
-            STEP-BY-STEP PROCESS:
-            1. Scrape the careers page content
-            2. Identify ALL job postings that match or relate to "{role_keyword}"
-            3. Include variations: "Senior {role_keyword}", "Staff {role_keyword}", "{role_keyword} II", etc.
-            4. Extract the EXACT href URL from each job's link (NOT button text!)
-            5. Extract location, handling "Remote", "Hybrid", or specific cities
-            6. Extract posting date if visible (any format is acceptable)
-            {exclusion_text}
-            {location_text}
-            
-            OUTPUT FORMAT - Return ONLY a JSON array:
-            [
-              {{"title": "Job Title", "url": "/path/to/job", "location": "City, State", "posted_date": "Jan 15"}},
-              ...
-            ]
-            
-            {FEW_SHOT_EXAMPLES}
-            
-            VALIDATION CHECKLIST (verify before responding):
-            ✓ Every "url" field contains an actual URL path, not "Apply Now"
-            ✓ Every "title" field is a real job title
-            ✓ Output is valid JSON array (no markdown, no explanation)
-            ✓ Empty array [] if no matching jobs found
-            
-            RESPOND WITH JSON ONLY - NO EXPLANATIONS
-            """,
+            description=TASK_TEMPLATE.format_map({
+                'company_name': company_name,
+                'careers_url': careers_url,
+                'role_keyword': role_keyword,
+                'exclusion_text': exclusion_text,
+                'location_text': location_text
+            }),
             expected_output="A valid JSON array of job objects",
             agent=agent
         )
     
+    def _get_agent(self) -> Agent:
+        """
+        Get this thread's cached recruiter agent, creating it on first use.
+        The scraper tool receives the URL at run time, so one agent serves every target.
+        """
+        agent = getattr(self._local, 'agent', None)
+        if agent is None:
+            agent = self._create_agent(PooledScrapeWebsiteTool())
+            self._local.agent = agent
+        return agent
+    
+    @staticmethod
+    def _cache_key(
+        careers_url: str,
+        role_keyword: str,
+        exclude_keywords: List[str] = None,
+        include_locations: List[str] = None
+    ) -> str:
+        """Build a scrape cache key so different role filters on one page don't alias."""
+        return "|".join((
+            careers_url,
+            role_keyword,
+            ",".join(sorted(exclude_keywords or [])),
+            ",".join(sorted(include_locations or []))
+        ))
+    
     @retry_with_backoff(max_retries=2, base_delay=3.0)
     def scrape_jobs(
         self,
@@ -170,6 +277,7 @@ class JobScraperAgent:
         include_locations = target.get('include_locations', [])
         
         domain = extract_domain(careers_url)
+        cache_key = self._cache_key(careers_url, role_keyword, exclude_keywords, include_locations)
         
         # Check circuit breaker
         if not circuit_breaker.can_execute(domain):
@@ -178,7 +286,7 @@ class JobScraperAgent:
         
         # Check cache
         if use_cache:
-            cached = scrape_cache.get(careers_url)
+            cached = scrape_cache.get(cache_key)
             if cached:
                 logger.info(f"Using cached results for {company_name}")
                 return cached
@@ -186,33 +294,24 @@ class JobScraperAgent:
         logger.info(f"🔍 Scraping {company_name}: {careers_url}")
         
         # Apply rate limiting
-        rate_limiter.wait(domain)
+        rate_limiter.acquire(domain)
         
         try:
-            # Initialize scraper and agent
-            scraper = ScrapeWebsiteTool(website_url=careers_url)
-            agent = self._create_agent(scraper)
-            task = self._create_task(
-                agent,
-                company_name,
-                careers_url,
-                role_keyword,
-                exclude_keywords,
-                include_locations
-            )
-            
-            # Execute crew
-            crew = Crew(
-                agents=[agent],
-                tasks=[task],
-                process=Process.sequential,
-                verbose=True
-            )
-            
-            result = crew.kickoff()
-            
-            # Parse and validate results
-            jobs, parsing_errors = self._parse_result(result, company_name, careers_url)
+            adapter = get_ats_adapter(careers_url)
+            if adapter:
+                # Known ATS with a public JSON API - no LLM needed
+                jobs = adapter(careers_url, role_keyword, exclude_keywords)
+                parsing_errors = 0
+            else:
+                jobs, parsing_errors = self._run_crew(
+                    company_name,
+                    careers_url,
+                    role_keyword,
+                    exclude_keywords,
+                    include_locations
+                )
+            # Same exclusions and location ordering whichever path produced the jobs
+            jobs = self._apply_filters(jobs, exclude_keywords, include_locations)
             
             search_result = JobSearchResult(
                 jobs=jobs,
@@ -222,19 +321,79 @@ class JobScraperAgent:
             
             # Cache successful results
             if jobs:
-                scrape_cache.set(careers_url, search_result)
+                scrape_cache.set(cache_key, search_result)
             
-            # Record success for circuit breaker
+            # Record success for circuit breaker and grow the domain's rate budget
             circuit_breaker.record_success(domain)
+            rate_limiter.additive_increase(domain)
             
             logger.info(f"✅ Found {len(jobs)} jobs at {company_name}")
             return search_result
             
         except Exception as e:
             circuit_breaker.record_failure(domain)
+            rate_limiter.multiplicative_decrease(domain)
             logger.error(f"❌ Failed to scrape {company_name}: {e}")
             return JobSearchResult(error=str(e))
     
+    def _run_crew(
+        self,
+        company_name: str,
+        careers_url: str,
+        role_keyword: str,
+        exclude_keywords: List[str] = None,
+        include_locations: List[str] = None
+    ) -> tuple[List[JobListing], int]:
+        """
+        Extract jobs from a careers page with the LLM agent.
+        
+        Returns:
+            Tuple of (validated jobs, parsing error count)
+        """
+        # Reuse the cached agent; only the task is target-specific
+        agent = self._get_agent()
+        task = self._create_task(
+            agent,
+            company_name,
+            careers_url,
+            role_keyword,
+            exclude_keywords,
+            include_locations
+        )
+        
+        # Execute crew
+        crew = Crew(
+            agents=[agent],
+            tasks=[task],
+            process=Process.sequential,
+            verbose=True
+        )
+        
+        result = crew.kickoff()
+        
+        # Parse and validate results (scrape_jobs applies the target filters)
+        return self._parse_result(result, company_name, careers_url)
+    
+    @staticmethod
+    def _apply_filters(
+        jobs: List[JobListing],
+        exclude_keywords: List[str] = None,
+        include_locations: List[str] = None
+    ) -> List[JobListing]:
+        """
+        Enforce target filters on scraped jobs (LLM or ATS).
+        Drops titles matching an excluded keyword and moves preferred locations to the front.
+        """
+        exclude_pattern = compile_keyword_pattern(tuple(exclude_keywords or ()))
+        if exclude_pattern:
+            jobs = [job for job in jobs if not exclude_pattern.search(job.title)]
+        
+        location_pattern = compile_keyword_pattern(tuple(include_locations or ()))
+        if location_pattern:
+            jobs.sort(key=lambda job: location_pattern.search(job.location) is None)
+        
+        return jobs
+    
     def _parse_result(
         self,
         result: Any,
@@ -243,64 +402,94 @@ class JobScraperAgent:
     ) -> tuple[List[JobListing], int]:
         """
         Parse and validate CrewAI result.
+        Identical output for the same page (e.g. on retries) is served from a parse cache.
         
         Returns:
             Tuple of (validated jobs, parsing error count)
         """
-        parsing_errors = 0
-        
         try:
-            # Get raw text
-            text_output = str(result).strip()
-            
-            # Clean up LLM formatting issues
-            text_output = text_output.replace("```json", "").replace("```", "").strip()
-            
-            # Find JSON array boundaries
-            start_idx = text_output.find('[')
-            end_idx = text_output.rfind(']')
-            
-            if start_idx == -1 or end_idx == -1:
+            # Locate the first complete JSON array - this also skips ``` fences and trailing notes
+            text_output = _find_json_array(str(result))
+            if text_output is None:
                 logger.warning(f"No JSON array found for {company_name}")
                 return [], 1
             
-            text_output = text_output[start_idx:end_idx + 1]
-            
-            # Try JSON parsing
-            try:
-                raw_jobs = json.loads(text_output)
-            except json.JSONDecodeError:
-                # Fallback to Python literal eval
-                try:
-                    raw_jobs = ast.literal_eval(text_output)
-                except:
-                    logger.error(f"Failed to parse output for {company_name}")
-                    return [], 1
-            
-            if not isinstance(raw_jobs, list):
-                logger.warning(f"Expected list, got {type(raw_jobs)} for {company_name}")
-                return [], 1
+            cache_key = f"{base_url}\n{text_output}"
+            cached = parse_cache.get(cache_key)
+            if cached is None:
+                cached = self._decode_jobs(text_output, company_name, base_url)
+                parse_cache.set(cache_key, cached)
             
-            # Validate each job with Pydantic
-            validated_jobs = []
-            for raw_job in raw_jobs:
-                try:
-                    # Normalize URL
-                    if 'url' in raw_job and raw_job['url']:
-                        raw_job['url'] = normalize_url(raw_job['url'], base_url)
-                    
-                    job = JobListing(**raw_job)
-                    validated_jobs.append(job)
-                except Exception as e:
-                    logger.debug(f"Invalid job entry: {raw_job} - {e}")
-                    parsing_errors += 1
-                    continue
-            
-            return validated_jobs, parsing_errors
+            jobs, parsing_errors = cached
+            return list(jobs), parsing_errors
             
         except Exception as e:
             logger.error(f"Parse error for {company_name}: {e}")
             return [], 1
+    
+    def _decode_jobs(
+        self,
+        text_output: str,
+        company_name: str,
+        base_url: str
+    ) -> tuple[List[JobListing], int]:
+        """
+        Decode a JSON array of jobs and validate each entry.
+        
+        Returns:
+            Tuple of (validated jobs, parsing error count)
+        """
+        parsing_errors = 0
+        
+        # Try JSON parsing
+        try:
+            raw_jobs = orjson.loads(text_output)
+        except orjson.JSONDecodeError:
+            # Fallback to Python literal eval
+            try:
+                raw_jobs = ast.literal_eval(text_output)
+            except (ValueError, SyntaxError):
+                logger.error(f"Failed to parse output for {company_name}")
+                return [], 1
+        
+        if not isinstance(raw_jobs, list):
+            logger.warning(f"Expected list, got {type(raw_jobs)} for {company_name}")
+            return [], 1
+        
+        # Normalize URLs before validation
+        for raw_job in raw_jobs:
+            if isinstance(raw_job, dict) and isinstance(raw_job.get('url'), str) and raw_job['url']:
+                raw_job['url'] = normalize_url(raw_job['url'], base_url)
+        
+        # Validate the whole list in one call; only re-split when some entries are invalid
+        try:
+            return JOB_LIST_ADAPTER.validate_python(raw_jobs), parsing_errors
+        except ValidationError as ve:
+            invalid_indexes = {err['loc'][0] for err in ve.errors() if err['loc']}
+        
+        valid_jobs = []
+        for index, raw_job in enumerate(raw_jobs):
+            if index in invalid_indexes:
+                logger.debug(f"Invalid job entry: {raw_job}")
+                parsing_errors += 1
+            else:
+                valid_jobs.append(raw_job)
+        
+        return JOB_LIST_ADAPTER.validate_python(valid_jobs), parsing_errors
+
+
+_scraper_agents: Dict[int, JobScraperAgent] = {}
+_scraper_agents_lock = threading.Lock()
+
+
+def get_scraper_agent(llm) -> JobScraperAgent:
+    """Get the shared JobScraperAgent for an LLM instance."""
+    with _scraper_agents_lock:
+        scraper_agent = _scraper_agents.get(id(llm))
+        if scraper_agent is None or scraper_agent.llm is not llm:
+            scraper_agent = JobScraperAgent(llm)
+            _scraper_agents[id(llm)] = scraper_agent
+        return scraper_agent
 
 
 def find_jobs(target: Dict[str, Any], llm) -> List[Dict]:
@@ -314,37 +503,171 @@ def find_jobs(target: Dict[str, Any], llm) -> List[Dict]:
     Returns:
         List of job dictionaries
     """
-    agent = JobScraperAgent(llm)
+    agent = get_scraper_agent(llm)
     result = agent.scrape_jobs(target)
     
     if result.error:
         logger.error(f"Scrape failed: {result.error}")
         return []
     
-    return [job.model_dump() for job in result.jobs]
+    return JOB_LIST_ADAPTER.dump_python(result.jobs)
+
+
+def _group_targets_by_page(
+    targets: List[Dict[str, Any]]
+) -> List[tuple[Dict[str, Any], List[int]]]:
+    """
+    Group targets that point at the same careers page so each page is scraped once.
+    
+    Pages served by an ATS adapter are grouped across roles, since the adapter's
+    matches_role filter can split the combined result exactly. LLM-scraped pages are
+    only grouped per role: the model's "match or closely related" judgement can't be
+    reproduced afterwards, so each role keeps its own prompt.
+    
+    Returns:
+        List of (target to scrape, indices of member targets) pairs. A group with several
+        members is scraped without filters; members are filtered afterwards.
+    """
+    groups: Dict[tuple, List[int]] = {}
+    for index, target in enumerate(targets):
+        careers_url = target.get('careers_url') or ''
+        page_key = normalize_url(careers_url)
+        role_key = None if get_ats_adapter(careers_url) else target.get('role_keyword', 'Software Engineer')
+        groups.setdefault((page_key, role_key), []).append(index)
+    
+    grouped = []
+    for indices in groups.values():
+        members = [targets[index] for index in indices]
+        if len(members) == 1:
+            grouped.append((members[0], indices))
+            continue
+        
+        roles = dict.fromkeys(m.get('role_keyword', 'Software Engineer') for m in members)
+        grouped.append(({
+            **members[0],
+            'role_keyword': ' | '.join(roles),
+            'exclude_keywords': [],
+            'include_locations': []
+        }, indices))
+    return grouped
+
+
+def _expand_group_results(
+    targets: List[Dict[str, Any]],
+    grouped: List[tuple[Dict[str, Any], List[int]]],
+    group_results: List[JobSearchResult]
+) -> List[JobSearchResult]:
+    """Split shared page results back out to each member target, aligned with targets."""
+    results: List[Optional[JobSearchResult]] = [None] * len(targets)
+    for (scraped_target, indices), result in zip(grouped, group_results):
+        if len(indices) == 1 or result.error:
+            for index in indices:
+                results[index] = result
+            continue
+        
+        for index in indices:
+            member = targets[index]
+            role_keyword = member.get('role_keyword', 'Software Engineer')
+            if role_keyword == scraped_target['role_keyword']:
+                jobs = list(result.jobs)
+            else:
+                # Only ATS pages mix roles, so this is the adapter's own role matching
+                jobs = [job for job in result.jobs if matches_role(job.title, role_keyword)]
+            jobs = JobScraperAgent._apply_filters(
+                jobs,
+                member.get('exclude_keywords'),
+                member.get('include_locations')
+            )
+            results[index] = JobSearchResult(
+                jobs=jobs,
+                total_found=len(jobs),
+                parsing_errors=result.parsing_errors
+            )
+    return results
 
 
 def scrape_multiple_targets(
     targets: List[Dict[str, Any]],
     llm,
-    parallel: bool = False
-) -> Dict[str, JobSearchResult]:
+    parallel: bool = False,
+    max_workers: int = 8
+) -> List[JobSearchResult]:
     """
-    Scrape multiple targets.
+    Scrape multiple targets. Targets sharing a careers page are fetched once.
     
     Args:
         targets: List of target configurations
         llm: LLM instance
-        parallel: Whether to scrape in parallel (not recommended due to rate limiting)
+        parallel: Whether to scrape in a thread pool (per-domain rate limiting still applies)
+        max_workers: Maximum number of worker threads when parallel is True
     
     Returns:
-        Dict mapping company names to their results
+        Results aligned with targets (several targets may share a company)
     """
-    agent = JobScraperAgent(llm)
-    results = {}
+    agent = get_scraper_agent(llm)
+    grouped = _group_targets_by_page(targets)
     
-    for target in targets:
-        company = target.get('company_name', 'Unknown')
-        results[company] = agent.scrape_jobs(target)
+    if not parallel:
+        group_results = [agent.scrape_jobs(target) for target, _ in grouped]
+        return _expand_group_results(targets, grouped, group_results)
     
-    return results
+    group_results: List[Optional[JobSearchResult]] = [None] * len(grouped)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        future_to_index = {
+            executor.submit(agent.scrape_jobs, target): index
+            for index, (target, _) in enumerate(grouped)
+        }
+        
+        for future in as_completed(future_to_index):
+            index = future_to_index[future]
+            try:
+                group_results[index] = future.result()
+            except Exception as e:
+                company = grouped[index][0].get('company_name', 'Unknown')
+                logger.error(f"❌ Failed to scrape {company}: {e}")
+                group_results[index] = JobSearchResult(error=str(e))
+    
+    return _expand_group_results(targets, grouped, group_results)
+
+
+async def scrape_multiple_targets_async(
+    targets: List[Dict[str, Any]],
+    llm,
+    max_concurrency: int = 4
+) -> List[JobSearchResult]:
+    """
+    Scrape multiple targets concurrently. Targets sharing a careers page are fetched once.
+    
+    Each scrape runs in a worker thread; a semaphore caps how many run at once.
+    Per-domain politeness is still enforced by the rate limiter in scrape_jobs.
+    
+    Args:
+        targets: List of target configurations
+        llm: LLM instance
+        max_concurrency: Maximum number of targets scraped at the same time
+    
+    Returns:
+        Results aligned with targets (several targets may share a company)
+    """
+    agent = get_scraper_agent(llm)
+    grouped = _group_targets_by_page(targets)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    
+    async def _scrape_one(target: Dict[str, Any]) -> JobSearchResult:
+        async with semaphore:
+            return await asyncio.to_thread(agent.scrape_jobs, target)
+    
+    outcomes = await asyncio.gather(
+        *(_scrape_one(target) for target, _ in grouped),
+        return_exceptions=True
+    )
+    
+    group_results = []
+    for (target, _), outcome in zip(grouped, outcomes):
+        if isinstance(outcome, BaseException):
+            company = target.get('company_name', 'Unknown')
+            logger.error(f"❌ Failed to scrape {company}: {outcome}")
+            outcome = JobSearchResult(error=str(outcome))
+        group_results.append(outcome)
+    
+    return _expand_group_results(targets, grouped, group_results)
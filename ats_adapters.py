@@ -0,0 +1,171 @@
+"""
+Direct adapters for applicant tracking systems with public JSON APIs.
+Greenhouse, Lever and Ashby boards are fetched as structured data, skipping the LLM entirely.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Callable
+from urllib.parse import urlparse, parse_qs
+from pydantic import ValidationError
+
+from models import JobListing, JOB_LIST_ADAPTER
+from scraper_utils import (
+    extract_domain,
+    get_random_user_agent,
+    get_http_client,
+    compile_keyword_pattern,
+    matches_role
+)
+
+logger = logging.getLogger(__name__)
+
+ATS_TIMEOUT = 30
+
+
+def _board_token(careers_url: str) -> Optional[str]:
+    """Get the company board token from an ATS careers URL (first path segment or ?for=)."""
+    parsed = urlparse(careers_url)
+    embed_token = parse_qs(parsed.query).get('for')
+    if embed_token:
+        return embed_token[0]
+    
+    segments = [segment for segment in parsed.path.split('/') if segment]
+    if not segments or segments[0] == 'embed':
+        return None
+    return segments[0]
+
+
+def _fetch_json(url: str) -> Any:
+    """Fetch and decode a JSON API response."""
+    headers = {"User-Agent": get_random_user_agent(), "Accept": "application/json"}
+    response = get_http_client().get(url, headers=headers, timeout=ATS_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def _matches_role(title: str, role_keyword: str, exclude_keywords: List[str]) -> bool:
+    """Check a title matches the role keyword and none of the excluded keywords."""
+    if not matches_role(title, role_keyword):
+        return False
+    exclude_pattern = compile_keyword_pattern(tuple(exclude_keywords))
+    return not (exclude_pattern and exclude_pattern.search(title))
+
+
+def _validate_postings(jobs: List[Dict[str, Any]], board: str) -> List[JobListing]:
+    """Validate a board's postings in one call, skipping malformed ones instead of failing the board."""
+    try:
+        return JOB_LIST_ADAPTER.validate_python(jobs)
+    except ValidationError as ve:
+        invalid_indexes = {err['loc'][0] for err in ve.errors() if err['loc']}
+    
+    for index in sorted(invalid_indexes):
+        logger.warning(f"Skipping invalid {board} posting: {jobs[index].get('url')}")
+    return JOB_LIST_ADAPTER.validate_python(
+        [job for index, job in enumerate(jobs) if index not in invalid_indexes]
+    )
+
+
+def _iso_date(value: Optional[str]) -> Optional[str]:
+    """Reduce an ISO-8601 timestamp to its date part."""
+    return value[:10] if value else None
+
+
+def fetch_greenhouse_jobs(
+    careers_url: str,
+    role_keyword: str,
+    exclude_keywords: List[str] = None
+) -> List[JobListing]:
+    """Fetch jobs from a Greenhouse board via boards-api.greenhouse.io."""
+    token = _board_token(careers_url)
+    if not token:
+        raise ValueError(f"Could not determine Greenhouse board from {careers_url}")
+    
+    data = _fetch_json(f"https://boards-api.greenhouse.io/v1/boards/{token}/jobs")
+    
+    jobs = []
+    for posting in data.get('jobs', []):
+        title = posting.get('title') or ''
+        if not posting.get('absolute_url') or not _matches_role(title, role_keyword, exclude_keywords or []):
+            continue
+        jobs.append(dict(
+            title=title,
+            url=posting['absolute_url'],
+            location=(posting.get('location') or {}).get('name') or "Not specified",
+            posted_date=_iso_date(posting.get('first_published') or posting.get('updated_at'))
+        ))
+    return _validate_postings(jobs, 'Greenhouse')
+
+
+def fetch_lever_jobs(
+    careers_url: str,
+    role_keyword: str,
+    exclude_keywords: List[str] = None
+) -> List[JobListing]:
+    """Fetch jobs from a Lever board via api.lever.co."""
+    token = _board_token(careers_url)
+    if not token:
+        raise ValueError(f"Could not determine Lever board from {careers_url}")
+    
+    data = _fetch_json(f"https://api.lever.co/v0/postings/{token}?mode=json")
+    
+    jobs = []
+    for posting in data:
+        title = posting.get('text') or ''
+        if not posting.get('hostedUrl') or not _matches_role(title, role_keyword, exclude_keywords or []):
+            continue
+        categories = posting.get('categories') or {}
+        created_at = posting.get('createdAt')
+        jobs.append(dict(
+            title=title,
+            url=posting['hostedUrl'],
+            location=categories.get('location') or "Not specified",
+            posted_date=(
+                datetime.fromtimestamp(created_at / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+                if created_at else None
+            ),
+            department=categories.get('team'),
+            employment_type=categories.get('commitment')
+        ))
+    return _validate_postings(jobs, 'Lever')
+
+
+def fetch_ashby_jobs(
+    careers_url: str,
+    role_keyword: str,
+    exclude_keywords: List[str] = None
+) -> List[JobListing]:
+    """Fetch jobs from an Ashby board via api.ashbyhq.com."""
+    token = _board_token(careers_url)
+    if not token:
+        raise ValueError(f"Could not determine Ashby board from {careers_url}")
+    
+    data = _fetch_json(f"https://api.ashbyhq.com/posting-api/job-board/{token}")
+    
+    jobs = []
+    for posting in data.get('jobs', []):
+        title = posting.get('title') or ''
+        if not posting.get('jobUrl') or not _matches_role(title, role_keyword, exclude_keywords or []):
+            continue
+        jobs.append(dict(
+            title=title,
+            url=posting['jobUrl'],
+            location=posting.get('location') or "Not specified",
+            posted_date=_iso_date(posting.get('publishedAt')),
+            department=posting.get('department'),
+            employment_type=posting.get('employmentType')
+        ))
+    return _validate_postings(jobs, 'Ashby')
+
+
+# Careers page host -> adapter
+ATS_ADAPTERS: Dict[str, Callable[..., List[JobListing]]] = {
+    "boards.greenhouse.io": fetch_greenhouse_jobs,
+    "job-boards.greenhouse.io": fetch_greenhouse_jobs,
+    "jobs.lever.co": fetch_lever_jobs,
+    "jobs.ashbyhq.com": fetch_ashby_jobs,
+}
+
+
+def get_ats_adapter(careers_url: str) -> Optional[Callable[..., List[JobListing]]]:
+    """Get the JSON API adapter for a careers URL, or None if the host needs the LLM."""
+    return ATS_ADAPTERS.get(extract_domain(careers_url).lower())
@@ -45,11 +45,22 @@ class Settings:
         # Scraping settings
         self.SCRAPE_TIMEOUT: int = int(os.getenv("SCRAPE_TIMEOUT", "60"))
         self.MAX_RETRIES: int = int(os.getenv("MAX_RETRIES", "3"))
+        self.SCRAPE_MAX_CONCURRENCY: int = int(os.getenv("SCRAPE_MAX_CONCURRENCY", "6"))
+        
+        # Notification digest (0 = notify after every job check)
+        self.NOTIFY_DIGEST_SECONDS: int = int(os.getenv("NOTIFY_DIGEST_SECONDS", "0"))
+        self.NOTIFY_DIGEST_MAX_JOBS: int = int(os.getenv("NOTIFY_DIGEST_MAX_JOBS", "50"))
+        
+        # Job history retention (0 = keep forever); needs a Firestore TTL policy on expire_at
+        self.JOB_HISTORY_TTL_DAYS: int = int(os.getenv("JOB_HISTORY_TTL_DAYS", "0"))
+        
+        # Stream all seen job IDs at startup instead of on the first job check (one read per stored job)
+        self.PRELOAD_SEEN_CACHE: bool = os.getenv("PRELOAD_SEEN_CACHE", "false").lower() == "true"
         
     @property
     def email_configured(self) -> bool:
         """Check if email notifications are properly configured."""
-        return all([self.GMAIL_USER, self.GMAIL_APP_PASSWORD, self.NOTIFICATION_EMAIL])
+        return bool(self.GMAIL_USER and self.GMAIL_APP_PASSWORD and self.NOTIFICATION_EMAIL)
     
     @property
     def llm_configured(self) -> bool:
@@ -3,33 +3,38 @@ Referral Agent - Professional FastAPI Application
 AI-powered job monitoring with comprehensive API endpoints.
 """
 import time
+import asyncio
+import hashlib
 import logging
+import orjson
 from pathlib import Path
-from typing import List, Optional
-from datetime import datetime, timedelta
-from urllib.parse import urljoin
+from functools import lru_cache
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urljoin, urlparse
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 # Import configuration
-from config import settings, db
+from config import settings
 
 # Import modules
 from storage import (
-    job_storage, target_storage,
-    get_active_targets, is_job_seen, save_job
+    StorageError, BulkSaveError, job_storage, target_storage, utc_midnight,
+    get_active_targets, get_seen_urls
 )
-from agent import find_jobs, JobScraperAgent
-from notifier import notification_service, send_all_notifications
+from agent import find_jobs
+from notifier import notification_service, send_all_notifications_async, close_webhook_client
+from scraper_utils import close_http_client
 from models import (
-    JobCheckResult, JobListing, JobStatus, JobStatusUpdate,
-    TargetCreate, TargetUpdate, StatsResponse, HealthStatus
+    JobCheckResult, JobListing, JobStatusUpdate, JobStatusBatchUpdate,
+    TargetCreate, TargetUpdate, StatsResponse, HealthStatus, STATUS_NEW
 )
 
 # Configure logging
@@ -45,6 +50,60 @@ BASE_DIR = Path(__file__).resolve().parent
 # Track uptime
 START_TIME = time.time()
 
+# Dashboard page, read once at import instead of on every request
+_dashboard_path = BASE_DIR / "templates" / "index.html"
+DASHBOARD_HTML = (
+    _dashboard_path.read_bytes() if _dashboard_path.exists()
+    else b"<h1>Referral Agent API</h1><p>API is running. Dashboard not available.</p>"
+)
+
+# Serialises digest sends so the periodic task and /check-jobs don't both send the same jobs
+_digest_lock = asyncio.Lock()
+
+
+async def flush_digest(only_if_due: bool = False) -> int:
+    """
+    Send jobs flagged digest_pending in storage as a single digest.
+    Pending jobs are read back from Firestore, so they survive an instance being
+    recycled between checks (e.g. Cloud Run scaling to zero).
+    
+    Args:
+        only_if_due: Skip unless NOTIFY_DIGEST_MAX_JOBS are pending or the oldest
+            one has waited NOTIFY_DIGEST_SECONDS
+    
+    Returns:
+        Number of jobs sent (0 on failure; the jobs stay pending)
+    """
+    async with _digest_lock:
+        try:
+            jobs = await asyncio.to_thread(job_storage.get_digest_pending_jobs)
+            if not jobs:
+                return 0
+            
+            if only_if_due and len(jobs) < settings.NOTIFY_DIGEST_MAX_JOBS:
+                due_at = datetime.now(timezone.utc) - timedelta(seconds=settings.NOTIFY_DIGEST_SECONDS)
+                found_at = [job['found_at'] for job in jobs if job.get('found_at')]
+                if found_at and min(found_at) > due_at:
+                    return 0
+            
+            logger.info(f"📬 Flushing notification digest with {len(jobs)} job(s)")
+            results = await send_all_notifications_async(jobs)
+            # Keep the jobs pending for the next flush if every channel failed
+            if results and not any(result.success for result in results.values()):
+                return 0
+            await asyncio.to_thread(job_storage.clear_digest_pending, [job['id'] for job in jobs])
+            return len(jobs)
+        except Exception as e:
+            logger.error(f"❌ Digest flush failed: {e}")
+            return 0
+
+
+async def run_digest(interval_seconds: float):
+    """Flush the digest every interval until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await flush_digest()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -55,9 +114,40 @@ async def lifespan(app: FastAPI):
     logger.info(f"   LLM configured: {settings.llm_configured}")
     logger.info(f"   Email configured: {settings.email_configured}")
     logger.info(f"   Notification channels: {notification_service.get_configured_channels()}")
+    
+    # Build the shared LLM client up front so the first job check doesn't pay for it
+    if settings.llm_configured:
+        try:
+            get_llm()
+        except Exception as e:
+            logger.warning(f"LLM warm-up failed: {e}")
+    
+    # Optionally stream the seen-job IDs in a worker thread so the first job check doesn't
+    # stall on it mid-scrape; otherwise that check loads them lazily
+    seen_cache_task = None
+    if settings.PRELOAD_SEEN_CACHE:
+        seen_cache_task = asyncio.create_task(asyncio.to_thread(job_storage.preload_seen_cache))
+    
+    digest_task = None
+    if settings.NOTIFY_DIGEST_SECONDS > 0:
+        logger.info(f"   Notification digest every {settings.NOTIFY_DIGEST_SECONDS}s")
+        digest_task = asyncio.create_task(run_digest(settings.NOTIFY_DIGEST_SECONDS))
     yield
     # Shutdown
     logger.info("👋 Shutting down Referral Agent API")
+    if seen_cache_task:
+        # Cancelling the task would not stop its worker thread, so signal the load to stop
+        # and give it a bounded wait before the clients are closed
+        job_storage.stop_seen_cache_load()
+        await asyncio.wait({seen_cache_task}, timeout=5)
+    if digest_task:
+        digest_task.cancel()
+        await asyncio.gather(digest_task, return_exceptions=True)
+        # Send what is pending now; anything left stays flagged in storage for the next flush
+        await flush_digest()
+    close_http_client()
+    close_webhook_client()
+    notification_service.close()
 
 
 # Create FastAPI app
@@ -66,6 +156,7 @@ app = FastAPI(
     description="AI-powered job monitoring agent that tracks career pages and notifies you of opportunities",
     version="2.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
 )
@@ -77,6 +168,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let cross-origin clients read the pagination cursor and conditional-request tag
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Mount static files
@@ -89,8 +182,9 @@ if static_dir.exists():
 # Helper Functions
 # =============================================================================
 
+@lru_cache(maxsize=1)
 def get_llm():
-    """Initialize and return the Gemini LLM instance."""
+    """Get the shared Gemini LLM instance, creating it on first use."""
     if not settings.GOOGLE_API_KEY:
         raise ValueError("GOOGLE_API_KEY not configured")
     
@@ -101,6 +195,57 @@ def get_llm():
     )
 
 
+def _process_target(target: Dict, llm) -> tuple[List[Dict], List[str]]:
+    """
+    Scrape one target and keep only jobs not seen before.
+    
+    Returns:
+        Tuple of (new enriched jobs, error messages)
+    """
+    careers_url = target.get('careers_url')
+    company_name = target.get('company_name', 'Unknown')
+    new_jobs = []
+    
+    try:
+        # Run the AI agent
+        jobs = [job for job in find_jobs(target, llm) if job.get('url')]
+        
+        # Handle relative URLs: root-relative paths just need the page's origin
+        parsed_careers_url = urlparse(careers_url)
+        origin = f"{parsed_careers_url.scheme}://{parsed_careers_url.netloc}"
+        for job in jobs:
+            job_url = job['url']
+            if job_url.startswith('/'):
+                job['url'] = urljoin(careers_url, job_url) if job_url.startswith('//') else origin + job_url
+        
+        # Check all URLs against history at once
+        seen = get_seen_urls([job['url'] for job in jobs])
+        
+        # Process each job
+        for job in jobs:
+            job_url = job['url']
+            
+            # Skip jobs already seen, including repeats within this page
+            if job_url not in seen:
+                seen.add(job_url)
+                
+                # Enrich job data
+                job['company_name'] = company_name
+                job['careers_url'] = careers_url
+                job['role_keyword'] = target.get('role_keyword')
+                job['status'] = STATUS_NEW
+                
+                new_jobs.append(job)
+                logger.info(f"✅ New: {job.get('title')} at {company_name}")
+        
+        return new_jobs, []
+        
+    except Exception as e:
+        error_msg = f"Error processing {company_name}: {e}"
+        logger.error(error_msg)
+        return new_jobs, [error_msg]
+
+
 # =============================================================================
 # Core Endpoints
 # =============================================================================
@@ -108,27 +253,39 @@ def get_llm():
 @app.get("/", response_class=HTMLResponse)
 def serve_dashboard():
     """Serve the frontend dashboard."""
-    template_path = BASE_DIR / "templates" / "index.html"
-    if template_path.exists():
-        with open(template_path, "r") as f:
-            return HTMLResponse(content=f.read())
-    return HTMLResponse(
-        content="<h1>Referral Agent API</h1><p>API is running. Dashboard not available.</p>"
-    )
+    return HTMLResponse(content=DASHBOARD_HTML, headers={"Cache-Control": "public, max-age=60"})
+
+
+async def _check_firestore() -> dict:
+    """Probe Firestore by listing active targets."""
+    try:
+        targets = await asyncio.to_thread(get_active_targets)
+        return {"status": "ok", "active_targets": len(targets)}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+async def _check_notifications() -> dict:
+    """Report configured notification channels."""
+    channels = notification_service.get_configured_channels()
+    return {
+        "status": "ok" if channels else "warning",
+        "configured_channels": channels
+    }
 
 
 @app.get("/health", response_model=HealthStatus)
-def health_check():
+async def health_check():
     """Comprehensive health check for monitoring."""
     checks = {}
     status = "healthy"
     
-    # Check Firestore
-    try:
-        targets = get_active_targets()
-        checks["firestore"] = {"status": "ok", "active_targets": len(targets)}
-    except Exception as e:
-        checks["firestore"] = {"status": "error", "message": str(e)}
+    # Run the probes concurrently
+    checks["firestore"], checks["notifications"] = await asyncio.gather(
+        _check_firestore(),
+        _check_notifications()
+    )
+    if checks["firestore"]["status"] == "error":
         status = "degraded"
     
     # Check LLM
@@ -138,13 +295,6 @@ def health_check():
         checks["llm"] = {"status": "warning", "message": "API key not configured"}
         status = "degraded"
     
-    # Check notifications
-    channels = notification_service.get_configured_channels()
-    checks["notifications"] = {
-        "status": "ok" if channels else "warning",
-        "configured_channels": channels
-    }
-    
     return HealthStatus(
         status=status,
         version="2.0.0",
@@ -168,65 +318,83 @@ def api_status():
 # =============================================================================
 
 @app.post("/check-jobs", response_model=JobCheckResult)
-def check_jobs_endpoint(background_tasks: BackgroundTasks = None):
+async def check_jobs_endpoint(background_tasks: BackgroundTasks):
     """
     Main job check workflow:
     1. Fetch active targets from Firestore
-    2. Scrape each target for jobs
-    3. Filter out already-seen jobs
-    4. Save new jobs to Firestore
-    5. Send notifications
+    2. Scrape and filter out already-seen jobs for all targets concurrently
+       (bounded by SCRAPE_MAX_CONCURRENCY)
+    3. Save new jobs to Firestore with a BulkWriter
+    4. Send notifications in the background
     """
     start_time = time.time()
     errors = []
     
     try:
+        targets = await asyncio.to_thread(get_active_targets)
+        if not targets:
+            logger.info("No active targets, skipping job check")
+            return JobCheckResult(
+                status="success",
+                message="No active targets",
+                duration_seconds=round(time.time() - start_time, 2)
+            )
+        
         llm = get_llm()
-        targets = get_active_targets()
         new_jobs_found = []
         
         logger.info(f"🚀 Starting job check for {len(targets)} active targets")
         
-        for target in targets:
-            careers_url = target.get('careers_url')
-            company_name = target.get('company_name', 'Unknown')
-            
+        # Process every target in worker threads
+        semaphore = asyncio.Semaphore(max(1, settings.SCRAPE_MAX_CONCURRENCY))
+        
+        async def run_target(target):
+            async with semaphore:
+                return await asyncio.to_thread(_process_target, target, llm)
+        
+        outcomes = await asyncio.gather(*(run_target(target) for target in targets))
+        
+        # Merge results, keeping one entry per URL when targets overlap
+        seen_this_run = set()
+        for target_jobs, target_errors in outcomes:
+            for job in target_jobs:
+                if job['url'] not in seen_this_run:
+                    seen_this_run.add(job['url'])
+                    new_jobs_found.append(job)
+            errors.extend(target_errors)
+        
+        # Drop reposts of known jobs under a different URL, then save the rest in one bulk write
+        if new_jobs_found:
+            new_jobs_found = await asyncio.to_thread(job_storage.drop_content_duplicates, new_jobs_found)
+        if new_jobs_found:
             try:
-                # Run the AI agent
-                jobs = find_jobs(target, llm)
-                
-                # Process each job
-                for job in jobs:
-                    job_url = job.get('url')
-                    if not job_url:
-                        continue
-                    
-                    # Handle relative URLs
-                    if job_url.startswith('/'):
-                        job_url = urljoin(careers_url, job_url)
-                        job['url'] = job_url
-                    
-                    # Check if already seen
-                    if not is_job_seen(job_url):
-                        # Enrich job data
-                        job['company_name'] = company_name
-                        job['careers_url'] = careers_url
-                        job['role_keyword'] = target.get('role_keyword')
-                        job['status'] = JobStatus.NEW.value
-                        
-                        save_job(job)
-                        new_jobs_found.append(job)
-                        logger.info(f"✅ New: {job.get('title')} at {company_name}")
-                        
+                created_ids = await asyncio.to_thread(
+                    job_storage.save_jobs_bulk, new_jobs_found, settings.NOTIFY_DIGEST_SECONDS > 0
+                )
+            except BulkSaveError as e:
+                # Jobs that were created are already seen, so notify them now; the failed
+                # ones are unsaved and will be found (and notified) again next run
+                error_msg = f"Error saving new jobs: {e}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+                created_ids = e.created_ids
             except Exception as e:
-                error_msg = f"Error processing {company_name}: {e}"
+                error_msg = f"Error saving new jobs: {e}"
                 logger.error(error_msg)
                 errors.append(error_msg)
-                continue
+                created_ids = set()
+            
+            # Only jobs this run actually created are new; others were stored meanwhile (e.g. by another instance)
+            job_id_for_url = job_storage.job_id_for_url
+            new_jobs_found = [job for job in new_jobs_found if job_id_for_url(job['url']) in created_ids]
         
-        # Send notifications
-        if new_jobs_found:
-            send_all_notifications(new_jobs_found)
+        # Send notifications after the response goes out. In digest mode the jobs were saved
+        # as digest_pending; flush here too once due, since on a request-driven deployment
+        # the lifespan task may not get CPU (or the instance may be gone) by the next interval
+        if settings.NOTIFY_DIGEST_SECONDS > 0:
+            background_tasks.add_task(flush_digest, True)
+        elif new_jobs_found:
+            background_tasks.add_task(send_all_notifications_async, new_jobs_found)
         
         duration = time.time() - start_time
         logger.info(f"✨ Job check complete in {duration:.1f}s. Found {len(new_jobs_found)} new jobs.")
@@ -235,7 +403,8 @@ def check_jobs_endpoint(background_tasks: BackgroundTasks = None):
             status="success",
             targets_checked=len(targets),
             new_jobs_count=len(new_jobs_found),
-            new_jobs=[JobListing(**j) for j in new_jobs_found],
+            # Already validated by the scraper; skip re-validation
+            new_jobs=[JobListing.from_trusted(j) for j in new_jobs_found],
             errors=errors,
             message=f"Found {len(new_jobs_found)} new jobs" if new_jobs_found else "No new jobs found",
             duration_seconds=round(duration, 2)
@@ -250,14 +419,54 @@ def check_jobs_endpoint(background_tasks: BackgroundTasks = None):
 # Target Management API
 # =============================================================================
 
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated `fields` query parameter into field names."""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(',') if field.strip()] or None
+
+
+def _json_default(value):
+    """Serialize Firestore timestamps, which orjson does not treat as datetimes."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _etag_response(request: Request, content, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Serialize a list response with a strong ETag.
+    
+    Returns 304 with no body when the client's If-None-Match already matches,
+    so polling dashboards only download data that actually changed.
+    """
+    response = ORJSONResponse(jsonable_encoder(content), headers=headers)
+    etag = f'"{hashlib.blake2b(response.body, digest_size=8).hexdigest()}"'
+    
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(',')]:
+        return Response(status_code=304, headers={"ETag": etag, **(headers or {})})
+    
+    response.headers["ETag"] = etag
+    return response
+
+
 @app.get("/api/targets")
-def list_targets():
-    """Get all targets."""
+def list_targets(request: Request, fields: Optional[str] = None):
+    """
+    Get all targets.
+    
+    - **fields**: Comma-separated fields to return (default: all)
+    
+    Supports conditional requests via `ETag` / `If-None-Match`.
+    """
     try:
-        return target_storage.get_all_targets()
+        targets = target_storage.get_all_targets(fields=_parse_fields(fields))
     except Exception as e:
         logger.error(f"Error listing targets: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    return _etag_response(request, targets)
 
 
 @app.get("/api/targets/{target_id}")
@@ -283,30 +492,31 @@ def create_target(target: TargetCreate):
 @app.put("/api/targets/{target_id}")
 def update_target(target_id: str, target: TargetCreate):
     """Update an existing target (full update)."""
-    if not target_storage.get_target(target_id):
-        raise HTTPException(status_code=404, detail="Target not found")
-    
     try:
-        target_storage.update_target(target_id, target.model_dump())
-        return {"id": target_id, **target.model_dump()}
+        updated = target_storage.update_target(target_id, target.model_dump())
     except Exception as e:
         logger.error(f"Error updating target: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if not updated:
+        raise HTTPException(status_code=404, detail="Target not found")
+    return {"id": target_id, **target.model_dump()}
 
 
 @app.patch("/api/targets/{target_id}")
 def patch_target(target_id: str, target: TargetUpdate):
     """Partially update a target."""
-    if not target_storage.get_target(target_id):
-        raise HTTPException(status_code=404, detail="Target not found")
+    update_data = {k: v for k, v in target.model_dump().items() if v is not None}
     
     try:
-        update_data = {k: v for k, v in target.model_dump().items() if v is not None}
-        target_storage.update_target(target_id, update_data)
-        return {"id": target_id, **update_data}
+        updated = target_storage.update_target(target_id, update_data)
     except Exception as e:
         logger.error(f"Error patching target: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if not updated:
+        raise HTTPException(status_code=404, detail="Target not found")
+    return {"id": target_id, **update_data}
 
 
 @app.delete("/api/targets/{target_id}")
@@ -323,36 +533,63 @@ def delete_target(target_id: str):
 
 @app.get("/api/jobs")
 def list_jobs(
+    request: Request,
     limit: int = Query(default=100, ge=1, le=500),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = None,
     company: Optional[str] = None,
     status: Optional[str] = None,
-    days: Optional[int] = Query(default=None, ge=1, le=365)
+    days: Optional[int] = Query(default=None, ge=1, le=365),
+    fields: Optional[str] = None,
+    stream: bool = False
 ):
     """
     Get jobs with filtering and pagination.
     
     - **limit**: Maximum number of jobs to return (1-500)
-    - **offset**: Number of jobs to skip
+    - **offset**: Number of jobs to skip (prefer cursor for deep pages)
+    - **cursor**: Value of the previous page's `X-Next-Cursor` header
     - **company**: Filter by company name
     - **status**: Filter by job status
-    - **days**: Only return jobs from the last N days
+    - **days**: Only return jobs from the last N calendar days (UTC), including today
+    - **fields**: Comma-separated fields to return (default: all)
+    - **stream**: Stream results as NDJSON (one job per line) instead of a JSON array
+    
+    When more results may exist, the `X-Next-Cursor` response header holds the cursor for the next page.
+    Supports conditional requests via `ETag` / `If-None-Match`. Neither header is sent when streaming.
     """
     try:
         since = None
         if days:
-            since = datetime.utcnow() - timedelta(days=days)
+            since = utc_midnight() - timedelta(days=days - 1)
         
-        return job_storage.get_jobs(
+        query_args = dict(
             limit=limit,
             offset=offset,
             company=company,
             status=status,
-            since=since
+            since=since,
+            cursor=cursor,
+            fields=_parse_fields(fields)
         )
+        if stream:
+            job_iter = job_storage.stream_jobs(**query_args)
+            return StreamingResponse(
+                (orjson.dumps(job, default=_json_default) + b"\n" for job in job_iter),
+                media_type="application/x-ndjson"
+            )
+        
+        jobs = job_storage.get_jobs(**query_args)
+    except StorageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing jobs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    headers = {}
+    if len(jobs) == limit:
+        headers["X-Next-Cursor"] = jobs[-1]['id']
+    return _etag_response(request, jobs, headers=headers)
 
 
 @app.get("/api/jobs/{job_id}")
@@ -364,22 +601,35 @@ def get_job(job_id: str):
     return job
 
 
+@app.patch("/api/jobs/status")
+def update_jobs_status(update: JobStatusBatchUpdate):
+    """Update the status of several jobs in batched commits."""
+    try:
+        updated = job_storage.update_jobs_batch(
+            [(job_id, update.status, update.notes) for job_id in update.job_ids]
+        )
+    except StorageError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {"message": "Status updated", "updated": updated, "status": update.status.value}
+
+
 @app.patch("/api/jobs/{job_id}/status")
 def update_job_status(job_id: str, update: JobStatusUpdate):
     """Update job status (mark as applied, saved, etc.)."""
-    if not job_storage.get_job(job_id):
-        raise HTTPException(status_code=404, detail="Job not found")
-    
-    success = job_storage.update_job_status(
-        job_id=job_id,
-        status=update.status,
-        notes=update.notes,
-        referral_contact=update.referral_contact
-    )
-    
-    if not success:
+    try:
+        updated = job_storage.update_job_status(
+            job_id=job_id,
+            status=update.status,
+            notes=update.notes,
+            referral_contact=update.referral_contact
+        )
+    except StorageError:
         raise HTTPException(status_code=500, detail="Failed to update status")
     
+    if not updated:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
     return {"message": "Status updated", "id": job_id, "status": update.status.value}
 
 
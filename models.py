@@ -2,13 +2,21 @@
 Pydantic models for structured data validation.
 Professional-grade type definitions with comprehensive validation.
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Generic, TypeVar
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from pydantic import BaseModel, Field, field_validator, ConfigDict, TypeAdapter
 import re
 
 
+# Trailing "- Apply Now..." button text scraped into titles
+_APPLY_NOW_RE = re.compile(r'\s*-\s*Apply Now.*$', re.IGNORECASE)
+
+# Button labels the LLM sometimes returns in place of a job URL
+_INVALID_URL_TEXTS = frozenset({'apply now', 'view job', 'learn more', 'click here'})
+
+
 class JobStatus(str, Enum):
     """Status of a job in the tracking workflow."""
     NEW = "new"
@@ -20,6 +28,10 @@ class JobStatus(str, Enum):
     OFFER = "offer"
 
 
+# Plain-string form of JobStatus.NEW for hot paths that build job dicts
+STATUS_NEW = JobStatus.NEW.value
+
+
 class ScrapeStrategy(str, Enum):
     """Available scraping strategies."""
     DEFAULT = "default"
@@ -29,7 +41,9 @@ class ScrapeStrategy(str, Enum):
 
 class JobListing(BaseModel):
     """Represents a single job listing extracted from a careers page."""
-    model_config = ConfigDict(extra="allow", str_strip_whitespace=True)
+    # Frozen: listings are never mutated after parsing (enrichment happens on dumped dicts).
+    # Extras stay allowed so enrichment fields survive from_trusted() into API responses.
+    model_config = ConfigDict(extra="allow", str_strip_whitespace=True, frozen=True)
     
     title: str = Field(..., min_length=1, max_length=500, description="Job title")
     url: str = Field(..., min_length=1, description="URL to the job posting")
@@ -46,12 +60,16 @@ class JobListing(BaseModel):
     salary_range: Optional[str] = None
     description_snippet: Optional[str] = None
     
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]) -> "JobListing":
+        """Build from already-validated data (stored or previously parsed jobs) without re-running validators."""
+        return cls.model_construct(**data)
+    
     @field_validator('url')
     @classmethod
     def validate_url(cls, v: str) -> str:
         """Ensure URL is not button text like 'Apply Now'."""
-        invalid_patterns = ['apply now', 'view job', 'learn more', 'click here']
-        if v.lower().strip() in invalid_patterns:
+        if v.lower().strip() in _INVALID_URL_TEXTS:
             raise ValueError(f"Invalid URL: '{v}' appears to be button text, not a URL")
         return v.strip()
     
@@ -59,9 +77,11 @@ class JobListing(BaseModel):
     @classmethod
     def clean_title(cls, v: str) -> str:
         """Clean up job title formatting."""
-        v = ' '.join(v.split())
-        v = re.sub(r'\s*-\s*Apply Now.*$', '', v, flags=re.IGNORECASE)
-        return v.strip()
+        return _APPLY_NOW_RE.sub('', ' '.join(v.split())).strip()
+
+
+# Shared adapter that validates a whole page of raw job dicts in a single pydantic-core call
+JOB_LIST_ADAPTER = TypeAdapter(List[JobListing])
 
 
 class JobWithMetadata(JobListing):
@@ -77,7 +97,7 @@ class JobWithMetadata(JobListing):
 
 class TargetConfig(BaseModel):
     """Configuration for a target company to monitor."""
-    model_config = ConfigDict(str_strip_whitespace=True)
+    model_config = ConfigDict(str_strip_whitespace=True, defer_build=True)
     
     id: Optional[str] = None
     company_name: str = Field(..., min_length=1, max_length=200)
@@ -131,9 +151,21 @@ class JobStatusUpdate(BaseModel):
     referral_contact: Optional[str] = None
 
 
-class JobSearchResult(BaseModel):
-    """Container for job search results from scraping."""
-    jobs: List[JobListing] = Field(default_factory=list)
+class JobStatusBatchUpdate(BaseModel):
+    """Request model for updating the status of several jobs at once."""
+    job_ids: List[str] = Field(..., min_length=1, max_length=500)
+    status: JobStatus
+    notes: Optional[str] = None
+
+
+@dataclass(slots=True)
+class JobSearchResult:
+    """
+    Container for job search results from scraping.
+    Internal only (never returned by the API), so it is a plain dataclass:
+    the jobs inside were already validated when they were parsed.
+    """
+    jobs: List[JobListing] = field(default_factory=list)
     total_found: int = 0
     parsing_errors: int = 0
     error: Optional[str] = None
@@ -158,15 +190,28 @@ class HealthStatus(BaseModel):
     checks: Dict[str, Any]
 
 
-class PaginatedResponse(BaseModel):
-    """Generic paginated response wrapper."""
-    items: List[Any]
+T = TypeVar("T")
+
+
+class PaginatedResponse(BaseModel, Generic[T]):
+    """Generic paginated response wrapper, e.g. PaginatedResponse[JobWithMetadata]."""
+    items: List[T]
     total: int
     page: int
     per_page: int
     pages: int
 
 
+class ActivityEntry(BaseModel):
+    """A single entry in the dashboard activity feed."""
+    timestamp: datetime
+    action: str
+    job_id: Optional[str] = None
+    company_name: Optional[str] = None
+    title: Optional[str] = None
+    status: Optional[JobStatus] = None
+
+
 class StatsResponse(BaseModel):
     """Dashboard statistics."""
     total_jobs: int
@@ -174,11 +219,13 @@ class StatsResponse(BaseModel):
     active_targets: int
     jobs_by_company: Dict[str, int]
     jobs_by_status: Dict[str, int]
-    recent_activity: List[Dict[str, Any]]
+    recent_activity: List[ActivityEntry]
 
 
 class NotificationConfig(BaseModel):
     """Configuration for notifications."""
+    model_config = ConfigDict(defer_build=True)
+    
     email_enabled: bool = True
     email_recipients: List[str] = Field(default_factory=list)
     slack_enabled: bool = False
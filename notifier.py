@@ -3,20 +3,140 @@ Notification system with multiple channels.
 Supports email, Slack, Discord with proper formatting.
 """
 import os
-import smtplib
+import asyncio
 import logging
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Optional, Callable
+import threading
+from typing import List, Dict, Optional, Callable, Tuple, TYPE_CHECKING
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import httpx
+import orjson
 
 from config import settings
 
+# httpx, smtplib and the email package are imported on first use, so an
+# instance that only uses some channels never loads the others' modules
+if TYPE_CHECKING:
+    import smtplib
+    import httpx
+    from email.message import EmailMessage
+
 logger = logging.getLogger(__name__)
 
+WEBHOOK_TIMEOUT = 30
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+_webhook_client: Optional["httpx.Client"] = None
+_webhook_client_lock = threading.Lock()
+
+
+def get_webhook_client() -> "httpx.Client":
+    """
+    Get the shared HTTP client used for Slack and Discord webhooks.
+    Reuses pooled connections and retries failed connection attempts.
+    """
+    global _webhook_client
+    if _webhook_client is None:
+        with _webhook_client_lock:
+            if _webhook_client is None:
+                import httpx
+                
+                _webhook_client = httpx.Client(
+                    timeout=WEBHOOK_TIMEOUT,
+                    transport=httpx.HTTPTransport(
+                        retries=2,
+                        limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+                    )
+                )
+    return _webhook_client
+
+
+def close_webhook_client():
+    """Close the shared webhook client and its pooled connections."""
+    global _webhook_client
+    with _webhook_client_lock:
+        if _webhook_client is not None:
+            _webhook_client.close()
+            _webhook_client = None
+
+
+# Same replacements as html.escape(quote=True), applied in a single translate pass
+_HTML_ESCAPE_TABLE = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#x27;',
+})
+
+
+def _escape_html(value) -> str:
+    """Escape scraped text for safe use in HTML content and attribute values."""
+    return str(value).translate(_HTML_ESCAPE_TABLE)
+
+
+# Static email shell around the job count and rows
+EMAIL_HTML_PREFIX = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        </head>
+        <body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f5f5f5; margin: 0; padding: 20px;">
+            <div style="max-width: 700px; margin: 0 auto; background: white; border-radius: 12px; overflow: hidden; box-shadow: 0 2px 8px rgba(0,0,0,0.08);">
+                <div style="background: linear-gradient(135deg, #3b82f6, #8b5cf6); padding: 24px 32px; color: white;">
+                    <h1 style="margin: 0; font-size: 22px; font-weight: 600;">🎯 New Job Openings Found!</h1>
+                    <p style="margin: 8px 0 0; opacity: 0.9; font-size: 14px;">Your Referral Agent found """
+
+EMAIL_HTML_MIDDLE = """ new position(s)</p>
+                </div>
+                
+                <div style="padding: 24px 32px;">
+                    <table style="width: 100%; border-collapse: collapse;">
+                        <thead>
+                            <tr style="background: #f8f9fa;">
+                                <th style="padding: 12px 16px; text-align: left; font-size: 12px; text-transform: uppercase; color: #666; font-weight: 600;">Company</th>
+                                <th style="padding: 12px 16px; text-align: left; font-size: 12px; text-transform: uppercase; color: #666; font-weight: 600;">Position</th>
+                                <th style="padding: 12px 16px; text-align: left; font-size: 12px; text-transform: uppercase; color: #666; font-weight: 600;">Location</th>
+                                <th style="padding: 12px 16px; text-align: left; font-size: 12px; text-transform: uppercase; color: #666; font-weight: 600;">Posted</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            """
+
+EMAIL_HTML_SUFFIX = """
+                        </tbody>
+                    </table>
+                </div>
+                
+                <div style="padding: 20px 32px; background: #f8f9fa; text-align: center; font-size: 13px; color: #888;">
+                    <p style="margin: 0;">Sent by <strong>Referral Agent</strong> • <a href="#" style="color: #3b82f6;">Dashboard</a></p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+
+# One <tr> per job in the email digest
+EMAIL_ROW_TEMPLATE = """
+            <tr>
+                <td style="padding: 12px 16px; border-bottom: 1px solid #eee;">
+                    <strong style="color: #333;">{company_name}</strong>
+                </td>
+                <td style="padding: 12px 16px; border-bottom: 1px solid #eee;">
+                    <a href="{url}" style="color: #2563eb; text-decoration: none; font-weight: 500;">
+                        {title}
+                    </a>
+                </td>
+                <td style="padding: 12px 16px; border-bottom: 1px solid #eee; color: #666;">
+                    📍 {location}
+                </td>
+                <td style="padding: 12px 16px; border-bottom: 1px solid #eee; color: #888; font-size: 13px;">
+                    {posted_date}
+                </td>
+            </tr>
+            """
+
 
 class NotificationError(Exception):
     """Custom exception for notification failures."""
@@ -51,6 +171,10 @@ class NotificationChannel(ABC):
     def send(self, jobs: List[Dict]) -> NotificationResult:
         """Send notification with job listings."""
         pass
+    
+    def close(self):
+        """Release any long-lived connections held by the channel."""
+        pass
 
 
 class EmailChannel(NotificationChannel):
@@ -62,6 +186,11 @@ class EmailChannel(NotificationChannel):
         self.sender = settings.GMAIL_USER
         self.password = settings.GMAIL_APP_PASSWORD
         self.recipient = settings.NOTIFICATION_EMAIL
+        self._configured = bool(self.sender and self.password and self.recipient)
+        
+        # Logged-in SMTP session, opened on first send and reused afterwards
+        self._smtp: Optional["smtplib.SMTP_SSL"] = None
+        self._smtp_lock = threading.Lock()
     
     @property
     def name(self) -> str:
@@ -69,7 +198,7 @@ class EmailChannel(NotificationChannel):
     
     @property
     def is_configured(self) -> bool:
-        return all([self.sender, self.password, self.recipient])
+        return self._configured
     
     def send(self, jobs: List[Dict]) -> NotificationResult:
         if not self.is_configured:
@@ -80,17 +209,16 @@ class EmailChannel(NotificationChannel):
             )
         
         try:
-            msg = MIMEMultipart("alternative")
+            # Single HTML part - no multipart container needed
+            from email.message import EmailMessage
+            
+            msg = EmailMessage()
             msg["Subject"] = f"🚀 Referral Agent: {len(jobs)} New Job(s) Found!"
             msg["From"] = self.sender
             msg["To"] = self.recipient
+            msg.set_content(self._build_html_body(jobs), subtype="html")
             
-            html_body = self._build_html_body(jobs)
-            msg.attach(MIMEText(html_body, "html"))
-            
-            with smtplib.SMTP_SSL(self.smtp_host, self.smtp_port) as server:
-                server.login(self.sender, self.password)
-                server.sendmail(self.sender, self.recipient, msg.as_string())
+            self._send_message(msg)
             
             logger.info(f"✅ Email sent to {self.recipient}")
             return NotificationResult(
@@ -107,66 +235,57 @@ class EmailChannel(NotificationChannel):
                 error=str(e)
             )
     
+    def _send_message(self, msg: "EmailMessage"):
+        """Send over the persistent session, reconnecting once if the server dropped it."""
+        import smtplib
+        
+        with self._smtp_lock:
+            try:
+                self._get_smtp().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                self._smtp = None
+                self._get_smtp().send_message(msg)
+            except Exception:
+                self._close_smtp()
+                raise
+    
+    def _get_smtp(self) -> "smtplib.SMTP_SSL":
+        """Open and log in to the SMTP server if there is no live session."""
+        if self._smtp is None:
+            import smtplib
+            
+            server = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=30)
+            server.login(self.sender, self.password)
+            self._smtp = server
+        return self._smtp
+    
+    def _close_smtp(self):
+        """Quit the SMTP session, ignoring errors from an already-dead connection."""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+    
+    def close(self):
+        with self._smtp_lock:
+            self._close_smtp()
+    
     def _build_html_body(self, jobs: List[Dict]) -> str:
         """Build professional HTML email."""
-        job_rows = ""
-        for job in jobs:
-            job_rows += f"""
-            <tr>
-                <td style="padding: 12px 16px; border-bottom: 1px solid #eee;">
-                    <strong style="color: #333;">{job.get('company_name', 'N/A')}</strong>
-                </td>
-                <td style="padding: 12px 16px; border-bottom: 1px solid #eee;">
-                    <a href="{job.get('url', '#')}" style="color: #2563eb; text-decoration: none; font-weight: 500;">
-                        {job.get('title', 'Unknown Title')}
-                    </a>
-                </td>
-                <td style="padding: 12px 16px; border-bottom: 1px solid #eee; color: #666;">
-                    📍 {job.get('location', 'Not specified')}
-                </td>
-                <td style="padding: 12px 16px; border-bottom: 1px solid #eee; color: #888; font-size: 13px;">
-                    {job.get('posted_date', 'N/A')}
-                </td>
-            </tr>
-            """
+        job_rows = "".join([
+            EMAIL_ROW_TEMPLATE.format(
+                company_name=_escape_html(job.get('company_name', 'N/A')),
+                url=_escape_html(job.get('url', '#')),
+                title=_escape_html(job.get('title', 'Unknown Title')),
+                location=_escape_html(job.get('location', 'Not specified')),
+                posted_date=_escape_html(job.get('posted_date', 'N/A'))
+            )
+            for job in jobs
+        ])
         
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        </head>
-        <body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f5f5f5; margin: 0; padding: 20px;">
-            <div style="max-width: 700px; margin: 0 auto; background: white; border-radius: 12px; overflow: hidden; box-shadow: 0 2px 8px rgba(0,0,0,0.08);">
-                <div style="background: linear-gradient(135deg, #3b82f6, #8b5cf6); padding: 24px 32px; color: white;">
-                    <h1 style="margin: 0; font-size: 22px; font-weight: 600;">🎯 New Job Openings Found!</h1>
-                    <p style="margin: 8px 0 0; opacity: 0.9; font-size: 14px;">Your Referral Agent found {len(jobs)} new position(s)</p>
-                </div>
-                
-                <div style="padding: 24px 32px;">
-                    <table style="width: 100%; border-collapse: collapse;">
-                        <thead>
-                            <tr style="background: #f8f9fa;">
-                                <th style="padding: 12px 16px; text-align: left; font-size: 12px; text-transform: uppercase; color: #666; font-weight: 600;">Company</th>
-                                <th style="padding: 12px 16px; text-align: left; font-size: 12px; text-transform: uppercase; color: #666; font-weight: 600;">Position</th>
-                                <th style="padding: 12px 16px; text-align: left; font-size: 12px; text-transform: uppercase; color: #666; font-weight: 600;">Location</th>
-                                <th style="padding: 12px 16px; text-align: left; font-size: 12px; text-transform: uppercase; color: #666; font-weight: 600;">Posted</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {job_rows}
-                        </tbody>
-                    </table>
-                </div>
-                
-                <div style="padding: 20px 32px; background: #f8f9fa; text-align: center; font-size: 13px; color: #888;">
-                    <p style="margin: 0;">Sent by <strong>Referral Agent</strong> • <a href="#" style="color: #3b82f6;">Dashboard</a></p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        return f"{EMAIL_HTML_PREFIX}{len(jobs)}{EMAIL_HTML_MIDDLE}{job_rows}{EMAIL_HTML_SUFFIX}"
 
 
 class SlackChannel(NotificationChannel):
@@ -174,6 +293,7 @@ class SlackChannel(NotificationChannel):
     
     def __init__(self):
         self.webhook_url = settings.SLACK_WEBHOOK_URL
+        self._configured = bool(self.webhook_url)
     
     @property
     def name(self) -> str:
@@ -181,7 +301,7 @@ class SlackChannel(NotificationChannel):
     
     @property
     def is_configured(self) -> bool:
-        return bool(self.webhook_url)
+        return self._configured
     
     def send(self, jobs: List[Dict]) -> NotificationResult:
         if not self.is_configured:
@@ -194,9 +314,10 @@ class SlackChannel(NotificationChannel):
         try:
             blocks = self._build_blocks(jobs)
             
-            with httpx.Client(timeout=30) as client:
-                response = client.post(self.webhook_url, json={"blocks": blocks})
-                response.raise_for_status()
+            response = get_webhook_client().post(
+                self.webhook_url, content=orjson.dumps({"blocks": blocks}), headers=JSON_HEADERS
+            )
+            response.raise_for_status()
             
             logger.info("✅ Slack notification sent")
             return NotificationResult(channel=self.name, success=True)
@@ -241,6 +362,7 @@ class DiscordChannel(NotificationChannel):
     
     def __init__(self):
         self.webhook_url = settings.DISCORD_WEBHOOK_URL
+        self._configured = bool(self.webhook_url)
     
     @property
     def name(self) -> str:
@@ -248,7 +370,7 @@ class DiscordChannel(NotificationChannel):
     
     @property
     def is_configured(self) -> bool:
-        return bool(self.webhook_url)
+        return self._configured
     
     def send(self, jobs: List[Dict]) -> NotificationResult:
         if not self.is_configured:
@@ -261,9 +383,10 @@ class DiscordChannel(NotificationChannel):
         try:
             embed = self._build_embed(jobs)
             
-            with httpx.Client(timeout=30) as client:
-                response = client.post(self.webhook_url, json={"embeds": [embed]})
-                response.raise_for_status()
+            response = get_webhook_client().post(
+                self.webhook_url, content=orjson.dumps({"embeds": [embed]}), headers=JSON_HEADERS
+            )
+            response.raise_for_status()
             
             logger.info("✅ Discord notification sent")
             return NotificationResult(channel=self.name, success=True)
@@ -297,15 +420,32 @@ class NotificationService:
     """
     
     def __init__(self):
+        self.reload()
+    
+    def reload(self):
+        """(Re)build channels from settings. Configuration is read once here, not per send."""
+        if hasattr(self, 'channels'):
+            self.close()
         self.channels: List[NotificationChannel] = [
             EmailChannel(),
             SlackChannel(),
             DiscordChannel(),
         ]
+        self._channels_by_name = {ch.name: ch for ch in self.channels}
+        self._configured_channels = tuple(ch.name for ch in self.channels if ch.is_configured)
+    
+    def close(self):
+        """Close long-lived channel connections (e.g. the SMTP session)."""
+        for ch in self.channels:
+            ch.close()
+    
+    def get_channel(self, name: str) -> Optional[NotificationChannel]:
+        """Get a channel instance by name."""
+        return self._channels_by_name.get(name)
     
-    def get_configured_channels(self) -> List[str]:
-        """Get list of configured channel names."""
-        return [ch.name for ch in self.channels if ch.is_configured]
+    def get_configured_channels(self) -> Tuple[str, ...]:
+        """Get configured channel names."""
+        return self._configured_channels
     
     def send_all(
         self,
@@ -322,11 +462,66 @@ class NotificationService:
         Returns:
             Dict mapping channel names to their results
         """
-        if not jobs:
-            logger.info("No jobs to notify about")
+        active_channels = self._active_channels(jobs, channels)
+        if not active_channels:
+            return {}
+        
+        results = {}
+        
+        def send_one(ch: NotificationChannel):
+            try:
+                results[ch.name] = ch.send(jobs)
+            except Exception as e:
+                results[ch.name] = NotificationResult(channel=ch.name, success=False, error=str(e))
+        
+        # Fan out with plain threads (cheaper than an executor for 1-3 sends);
+        # the calling thread handles the first channel itself
+        threads = [threading.Thread(target=send_one, args=(ch,)) for ch in active_channels[1:]]
+        for thread in threads:
+            thread.start()
+        send_one(active_channels[0])
+        for thread in threads:
+            thread.join()
+        
+        self._log_summary(results)
+        return results
+    
+    async def send_all_async(
+        self,
+        jobs: List[Dict],
+        channels: List[str] = None
+    ) -> Dict[str, NotificationResult]:
+        """
+        Async variant of send_all for use from the event loop.
+        Channel sends run concurrently via asyncio.to_thread instead of a dedicated executor.
+        """
+        active_channels = self._active_channels(jobs, channels)
+        if not active_channels:
             return {}
         
+        outcomes = await asyncio.gather(
+            *(asyncio.to_thread(ch.send, jobs) for ch in active_channels),
+            return_exceptions=True
+        )
+        
         results = {}
+        for ch, outcome in zip(active_channels, outcomes):
+            if isinstance(outcome, Exception):
+                outcome = NotificationResult(channel=ch.name, success=False, error=str(outcome))
+            results[ch.name] = outcome
+        
+        self._log_summary(results)
+        return results
+    
+    def _active_channels(
+        self,
+        jobs: List[Dict],
+        channels: List[str] = None
+    ) -> List[NotificationChannel]:
+        """Resolve the configured channels to send to, or [] if there is nothing to send."""
+        if not jobs:
+            logger.info("No jobs to notify about")
+            return []
         
         # Filter channels if specified
         active_channels = self.channels
@@ -339,35 +534,16 @@ class NotificationService:
         if not active_channels:
             logger.warning("No notification channels configured")
             self._log_to_console(jobs)
-            return {}
         
-        # Send to all channels in parallel
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = {
-                executor.submit(ch.send, jobs): ch.name
-                for ch in active_channels
-            }
-            
-            for future in as_completed(futures):
-                channel_name = futures[future]
-                try:
-                    result = future.result()
-                    results[channel_name] = result
-                except Exception as e:
-                    results[channel_name] = NotificationResult(
-                        channel=channel_name,
-                        success=False,
-                        error=str(e)
-                    )
-        
-        # Log summary
+        return active_channels
+    
+    def _log_summary(self, results: Dict[str, NotificationResult]):
+        """Log which channels delivered successfully."""
         successful = [k for k, v in results.items() if v.success]
         if successful:
             logger.info(f"📨 Notifications sent via: {', '.join(successful)}")
         else:
             logger.warning("⚠️ No notifications were sent successfully")
-        
-        return results
     
     def _log_to_console(self, jobs: List[Dict]):
         """Fallback: Log jobs to console."""
@@ -384,12 +560,21 @@ notification_service = NotificationService()
 # Legacy function for backward compatibility
 def send_all_notifications(new_jobs: List[Dict]) -> Dict[str, NotificationResult]:
     """Legacy wrapper for notification_service.send_all()."""
+    if not new_jobs:
+        return {}
     return notification_service.send_all(new_jobs)
 
 
+async def send_all_notifications_async(new_jobs: List[Dict]) -> Dict[str, NotificationResult]:
+    """Async wrapper for notification_service.send_all_async()."""
+    return await notification_service.send_all_async(new_jobs)
+
+
 def send_email_notification(new_jobs: List[Dict]) -> bool:
     """Legacy wrapper for email-only notification."""
-    channel = EmailChannel()
+    if not new_jobs:
+        return False
+    channel = notification_service.get_channel("email")
     if not channel.is_configured:
         return False
     result = channel.send(new_jobs)
@@ -398,7 +583,9 @@ def send_email_notification(new_jobs: List[Dict]) -> bool:
 
 def send_slack_notification(new_jobs: List[Dict]) -> bool:
     """Legacy wrapper for Slack-only notification."""
-    channel = SlackChannel()
+    if not new_jobs:
+        return False
+    channel = notification_service.get_channel("slack")
     if not channel.is_configured:
         return False
     result = channel.send(new_jobs)
@@ -407,7 +594,9 @@ def send_slack_notification(new_jobs: List[Dict]) -> bool:
 
 def send_discord_notification(new_jobs: List[Dict]) -> bool:
     """Legacy wrapper for Discord-only notification."""
-    channel = DiscordChannel()
+    if not new_jobs:
+        return False
+    channel = notification_service.get_channel("discord")
     if not channel.is_configured:
         return False
     result = channel.send(new_jobs)
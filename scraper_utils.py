@@ -1,15 +1,21 @@
 """
 Enhanced scraping utilities with retry logic, caching, and professional error handling.
 """
+import re
+import math
 import logging
 import random
 import time
+import zlib
 import hashlib
-from typing import Optional, Dict, Callable, TypeVar, Any
-from functools import wraps
-from urllib.parse import urlparse
+import itertools
+import threading
+from typing import Optional, Dict, List, Callable, TypeVar, Any, Tuple, Pattern
+from collections import Counter
+from functools import wraps, lru_cache
+from urllib.parse import urlparse, urljoin, urlunparse
 from datetime import datetime, timedelta
-from collections import OrderedDict
+import httpx
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +30,13 @@ USER_AGENTS = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
 ]
 
+# Round-robin over a shuffled order so each process starts on a different User-Agent
+_USER_AGENT_CYCLE = itertools.cycle(random.sample(USER_AGENTS, len(USER_AGENTS)))
+
 
 def get_random_user_agent() -> str:
-    """Get a random User-Agent string."""
-    return random.choice(USER_AGENTS)
+    """Get the next User-Agent string in rotation."""
+    return next(_USER_AGENT_CYCLE)
 
 
 def get_default_headers() -> Dict[str, str]:
@@ -36,7 +45,7 @@ def get_default_headers() -> Dict[str, str]:
         "User-Agent": get_random_user_agent(),
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
         "Accept-Language": "en-US,en;q=0.5",
-        "Accept-Encoding": "gzip, deflate, br",
+        "Accept-Encoding": "gzip, deflate",  # httpx only decodes brotli when the extra is installed
         "DNT": "1",
         "Connection": "keep-alive",
         "Upgrade-Insecure-Requests": "1",
@@ -48,6 +57,36 @@ def get_default_headers() -> Dict[str, str]:
     }
 
 
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Get the shared HTTP client used for page and API fetches.
+    Keeps connections alive so repeat requests to a host skip the TCP/TLS handshake.
+    """
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = httpx.Client(
+                    timeout=30,
+                    follow_redirects=True,
+                    limits=httpx.Limits(max_connections=64, max_keepalive_connections=16)
+                )
+    return _http_client
+
+
+def close_http_client():
+    """Close the shared HTTP client and its pooled connections."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
+
 class RetryError(Exception):
     """Raised when all retry attempts are exhausted."""
     def __init__(self, message: str, last_exception: Exception = None):
@@ -55,6 +94,17 @@ class RetryError(Exception):
         self.last_exception = last_exception
 
 
+def _retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Get the Retry-After delay (in seconds) from an HTTP 429 error, if it has one."""
+    response = getattr(exc, 'response', None)
+    if response is None or getattr(response, 'status_code', None) != 429:
+        return None
+    try:
+        return max(0.0, float(response.headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return None
+
+
 def retry_with_backoff(
     max_retries: int = 3,
     base_delay: float = 1.0,
@@ -68,14 +118,15 @@ def retry_with_backoff(
     Args:
         max_retries: Maximum number of retry attempts
         base_delay: Initial delay between retries (seconds)
-        max_delay: Maximum delay between retries (seconds)
-        exponential: Use exponential backoff if True, else linear
+        max_delay: Maximum delay between retries (seconds); also caps Retry-After
+        exponential: Use exponential backoff with decorrelated jitter if True, else linear
         exceptions: Tuple of exceptions to catch and retry
     """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
         def wrapper(*args, **kwargs) -> T:
             last_exception = None
+            prev_delay = base_delay
             
             for attempt in range(max_retries + 1):
                 try:
@@ -84,13 +135,17 @@ def retry_with_backoff(
                     last_exception = e
                     
                     if attempt < max_retries:
-                        if exponential:
-                            delay = min(base_delay * (2 ** attempt), max_delay)
+                        retry_after = _retry_after_seconds(e)
+                        if retry_after is not None:
+                            # The server told us when to come back
+                            delay = min(retry_after, max_delay)
+                        elif exponential:
+                            # Decorrelated jitter: parallel callers spread out instead of retrying in lockstep
+                            delay = min(max_delay, random.uniform(base_delay, prev_delay * 3))
                         else:
                             delay = min(base_delay * (attempt + 1), max_delay)
-                        
-                        # Add jitter to prevent thundering herd
-                        delay += random.uniform(0, delay * 0.1)
+                            delay += random.uniform(0, delay * 0.1)
+                        prev_delay = delay
                         
                         logger.warning(
                             f"Attempt {attempt + 1}/{max_retries + 1} failed for {func.__name__}: {e}. "
@@ -119,36 +174,40 @@ class RateLimiter:
         self.max_delay = max_delay
         self.last_request_time: Dict[str, float] = {}
         self._lock_times: Dict[str, float] = {}
+        self._lock = threading.Lock()
     
     def wait(self, domain: str) -> float:
         """
         Wait before making a request to the given domain.
         Returns the actual delay used.
         """
-        now = time.time()
-        required_delay = random.uniform(self.min_delay, self.max_delay)
-        
-        if domain in self.last_request_time:
-            elapsed = now - self.last_request_time[domain]
+        with self._lock:
+            now = time.monotonic()
+            last = self.last_request_time.get(domain)
+            
+            # Past max_delay no random delay can still be pending, so skip the RNG
+            if last is None or now - last >= self.max_delay:
+                self.last_request_time[domain] = now
+                return 0.0
             
-            if elapsed < required_delay:
-                sleep_time = required_delay - elapsed
-                logger.debug(f"Rate limiting: waiting {sleep_time:.1f}s for {domain}")
-                time.sleep(sleep_time)
-                required_delay = sleep_time
+            sleep_time = max(0.0, random.uniform(self.min_delay, self.max_delay) - (now - last))
+            # Reserve the slot now so concurrent callers queue behind this request
+            self.last_request_time[domain] = now + sleep_time
         
-        self.last_request_time[domain] = time.time()
-        return required_delay
+        if sleep_time > 0:
+            logger.debug(f"Rate limiting: waiting {sleep_time:.1f}s for {domain}")
+            time.sleep(sleep_time)
+        return sleep_time
     
     def is_locked(self, domain: str) -> bool:
         """Check if domain is temporarily locked due to rate limiting."""
         if domain not in self._lock_times:
             return False
-        return time.time() < self._lock_times[domain]
+        return time.monotonic() < self._lock_times[domain]
     
     def lock(self, domain: str, duration: float = 60.0):
         """Temporarily lock a domain (e.g., after receiving 429)."""
-        self._lock_times[domain] = time.time() + duration
+        self._lock_times[domain] = time.monotonic() + duration
         logger.warning(f"Domain {domain} locked for {duration}s")
     
     def unlock(self, domain: str):
@@ -156,52 +215,132 @@ class RateLimiter:
         self._lock_times.pop(domain, None)
 
 
+class TokenBucketLimiter(RateLimiter):
+    """
+    Per-domain token bucket with AIMD (additive-increase/multiplicative-decrease) sizing.
+    Independent domains never wait on each other; each bucket grows on success
+    and shrinks on failure, adapting to what the upstream site tolerates.
+    """
+    
+    def __init__(
+        self,
+        min_delay: float = 2.0,
+        max_delay: float = 5.0,
+        initial_capacity: float = 1.0,
+        max_capacity: float = 5.0
+    ):
+        super().__init__(min_delay, max_delay)
+        self.refill_rate = 2.0 / (min_delay + max_delay)  # tokens per second
+        self.initial_capacity = initial_capacity
+        self.max_capacity = max_capacity
+        self._buckets: Dict[str, Dict[str, float]] = {}
+    
+    def _refill(self, domain: str, now: float) -> Dict[str, float]:
+        """Get the bucket for a domain, topped up for the time elapsed. Caller holds the lock."""
+        bucket = self._buckets.get(domain)
+        if bucket is None:
+            bucket = {"capacity": self.initial_capacity, "tokens": self.initial_capacity, "updated": now}
+            self._buckets[domain] = bucket
+            return bucket
+        
+        elapsed = now - bucket["updated"]
+        bucket["tokens"] = min(bucket["capacity"], bucket["tokens"] + elapsed * self.refill_rate)
+        bucket["updated"] = now
+        return bucket
+    
+    def acquire(self, domain: str) -> float:
+        """
+        Block until a token is available for the given domain.
+        Returns the total time spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                bucket = self._refill(domain, time.monotonic())
+                if bucket["tokens"] >= 1.0:
+                    bucket["tokens"] -= 1.0
+                    self.last_request_time[domain] = bucket["updated"]
+                    return waited
+                sleep_time = (1.0 - bucket["tokens"]) / self.refill_rate
+            
+            logger.debug(f"Rate limiting: waiting {sleep_time:.1f}s for {domain}")
+            time.sleep(sleep_time)
+            waited += sleep_time
+    
+    def wait(self, domain: str) -> float:
+        """Token-bucket version of RateLimiter.wait: bursts up to the bucket's capacity pass without delay."""
+        return self.acquire(domain)
+    
+    def additive_increase(self, domain: str, delta: float = 1.0):
+        """Grow the domain's bucket after a successful request."""
+        with self._lock:
+            bucket = self._refill(domain, time.monotonic())
+            bucket["capacity"] = min(self.max_capacity, bucket["capacity"] + delta)
+    
+    def multiplicative_decrease(self, domain: str, factor: float = 0.5):
+        """Shrink the domain's bucket after a failed or throttled request."""
+        with self._lock:
+            bucket = self._refill(domain, time.monotonic())
+            bucket["capacity"] = max(1.0, bucket["capacity"] * factor)
+            bucket["tokens"] = min(bucket["tokens"], bucket["capacity"])
+            logger.debug(f"Rate limiter capacity for {domain} reduced to {bucket['capacity']:.1f}")
+
+
 class LRUCache:
     """
-    Simple LRU cache for storing scraped content temporarily.
+    Simple thread-safe LRU cache for storing scraped content temporarily.
     Useful for avoiding re-scraping the same page within a session.
     """
     
     def __init__(self, max_size: int = 100, ttl_seconds: int = 3600):
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
-        self._cache: OrderedDict[str, tuple] = OrderedDict()
+        # key -> (value, expires_at); plain dicts keep insertion order, oldest first
+        self._cache: Dict[bytes, tuple] = {}
+        self._lock = threading.Lock()
     
-    def _make_key(self, url: str) -> str:
-        """Create cache key from URL."""
-        return hashlib.md5(url.encode()).hexdigest()
+    def _make_key(self, url: str) -> bytes:
+        """Create cache key from URL (raw 64-bit BLAKE2b digest; plenty for an in-process cache)."""
+        return hashlib.blake2b(url.encode(), digest_size=8).digest()
     
     def get(self, url: str) -> Optional[Any]:
         """Get cached value if exists and not expired."""
         key = self._make_key(url)
         
-        if key not in self._cache:
-            return None
-        
-        value, timestamp = self._cache[key]
-        
-        # Check TTL
-        if time.time() - timestamp > self.ttl_seconds:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            
+            value, expires_at = entry
+            
+            # Check TTL
+            if time.monotonic() > expires_at:
+                del self._cache[key]
+                return None
+            
+            # Move to end (most recently used)
             del self._cache[key]
-            return None
-        
-        # Move to end (most recently used)
-        self._cache.move_to_end(key)
-        return value
+            self._cache[key] = entry
+            return value
     
     def set(self, url: str, value: Any):
         """Store value in cache."""
         key = self._make_key(url)
         
-        # Remove oldest if at capacity
-        while len(self._cache) >= self.max_size:
-            self._cache.popitem(last=False)
-        
-        self._cache[key] = (value, time.time())
+        with self._lock:
+            self._cache.pop(key, None)
+            
+            # Remove oldest if at capacity
+            while len(self._cache) >= self.max_size:
+                del self._cache[next(iter(self._cache))]
+            
+            self._cache[key] = (value, time.monotonic() + self.ttl_seconds)
     
     def clear(self):
         """Clear all cached items."""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
     
     def stats(self) -> Dict[str, int]:
         """Get cache statistics."""
@@ -218,6 +357,9 @@ class CircuitBreaker:
     Opens circuit after threshold failures, preventing further attempts temporarily.
     """
     
+    CLOSED, OPEN, HALF_OPEN = 0, 1, 2
+    STATE_NAMES = {CLOSED: "closed", OPEN: "open", HALF_OPEN: "half-open"}
+    
     def __init__(
         self,
         failure_threshold: int = 5,
@@ -228,59 +370,74 @@ class CircuitBreaker:
         self.recovery_timeout = recovery_timeout
         self.half_open_requests = half_open_requests
         
-        self._failures: Dict[str, int] = {}
-        self._last_failure: Dict[str, float] = {}
-        self._state: Dict[str, str] = {}  # closed, open, half-open
-    
-    def _get_state(self, key: str) -> str:
-        """Get current state for a key."""
-        if key not in self._state:
-            self._state[key] = "closed"
-        
-        state = self._state[key]
+        # key -> [state, failures, last_failure]; one lookup per call, mutated under the lock
+        self._breakers: Dict[str, list] = {}
+        self._lock = threading.Lock()
+    
+    def _get_state(self, key: str) -> int:
+        """Get current state for a key. Caller holds the lock."""
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            return self.CLOSED
         
         # Check if we should transition from open to half-open
-        if state == "open":
-            if time.time() - self._last_failure.get(key, 0) > self.recovery_timeout:
-                self._state[key] = "half-open"
-                return "half-open"
+        if breaker[0] == self.OPEN and time.monotonic() - breaker[2] > self.recovery_timeout:
+            breaker[0] = self.HALF_OPEN
         
-        return state
+        return breaker[0]
     
     def can_execute(self, key: str) -> bool:
         """Check if execution is allowed."""
-        state = self._get_state(key)
-        return state in ("closed", "half-open")
+        with self._lock:
+            return self._get_state(key) != self.OPEN
     
     def record_success(self, key: str):
         """Record a successful execution."""
-        self._failures[key] = 0
-        self._state[key] = "closed"
+        with self._lock:
+            self._breakers.pop(key, None)
     
     def record_failure(self, key: str):
         """Record a failed execution."""
-        self._failures[key] = self._failures.get(key, 0) + 1
-        self._last_failure[key] = time.time()
-        
-        if self._failures[key] >= self.failure_threshold:
-            self._state[key] = "open"
-            logger.warning(f"Circuit breaker opened for {key}")
+        with self._lock:
+            breaker = self._breakers.setdefault(key, [self.CLOSED, 0, 0.0])
+            breaker[1] += 1
+            breaker[2] = time.monotonic()
+            
+            if breaker[1] >= self.failure_threshold and breaker[0] != self.OPEN:
+                breaker[0] = self.OPEN
+                logger.warning(f"Circuit breaker opened for {key}")
     
     def get_status(self, key: str) -> Dict[str, Any]:
         """Get circuit breaker status for a key."""
-        return {
-            "state": self._get_state(key),
-            "failures": self._failures.get(key, 0),
-            "threshold": self.failure_threshold
-        }
+        with self._lock:
+            state = self._get_state(key)
+            breaker = self._breakers.get(key)
+            return {
+                "state": self.STATE_NAMES[state],
+                "failures": breaker[1] if breaker else 0,
+                "threshold": self.failure_threshold
+            }
 
 
+@lru_cache(maxsize=4096)
 def extract_domain(url: str) -> str:
     """Extract domain from URL for rate limiting."""
+    # Fast path for plain http(s) URLs: the host runs up to the first '/', '?' or '#'
+    if url.startswith(('https://', 'http://')):
+        start = url.index('://') + 3
+        end = len(url)
+        for delimiter in '/?#':
+            position = url.find(delimiter, start, end)
+            if position >= 0:
+                end = position
+        if end > start:
+            return url[start:end]
+    
     parsed = urlparse(url)
     return parsed.netloc or url
 
 
+@lru_cache(maxsize=4096)
 def normalize_url(url: str, base_url: str = None) -> str:
     """
     Normalize a URL, handling relative paths.
@@ -292,8 +449,6 @@ def normalize_url(url: str, base_url: str = None) -> str:
     Returns:
         Normalized absolute URL
     """
-    from urllib.parse import urljoin, urlparse, urlunparse
-    
     # Handle relative URLs
     if base_url and not url.startswith(('http://', 'https://')):
         url = urljoin(base_url, url)
@@ -317,6 +472,37 @@ def normalize_url(url: str, base_url: str = None) -> str:
     return normalized
 
 
+@lru_cache(maxsize=256)
+def compile_keyword_pattern(keywords: Tuple[str, ...]) -> Optional[Pattern]:
+    """
+    Compile keywords into a single case-insensitive alternation.
+    One regex scan per text replaces a Python loop over every keyword.
+    
+    Args:
+        keywords: Keywords to match (pass a tuple so the result can be cached)
+    
+    Returns:
+        Compiled pattern, or None if there are no non-empty keywords
+    """
+    keywords = [k.strip() for k in keywords if k and k.strip()]
+    if not keywords:
+        return None
+    # Longest first so overlapping keywords prefer the most specific match
+    return re.compile("|".join(map(re.escape, sorted(keywords, key=len, reverse=True))), re.IGNORECASE)
+
+
+def matches_role(title: str, role_keyword: str) -> bool:
+    """
+    Check whether a job title matches a role keyword.
+    The title must contain every word of the keyword; alternatives can be given as "A | B".
+    """
+    title_lower = title.lower()
+    return any(
+        all(word in title_lower for word in alternative.lower().split())
+        for alternative in role_keyword.split('|')
+    )
+
+
 def calculate_similarity(text1: str, text2: str) -> float:
     """
     Calculate similarity between two strings using Jaccard index.
@@ -328,13 +514,84 @@ def calculate_similarity(text1: str, text2: str) -> float:
     words1 = set(text1.lower().split())
     words2 = set(text2.lower().split())
     
-    intersection = words1 & words2
-    union = words1 | words2
+    # |A ∪ B| = |A| + |B| - |A ∩ B|, so the union set never needs building
+    intersection = len(words1 & words2)
+    union = len(words1) + len(words2) - intersection
+    
+    return intersection / union if union else 0.0
+
+
+def title_signature(text: str) -> int:
+    """
+    Compute a 64-bit word bitset for a title (one bit per word, by stable CRC32).
+    Signatures can be computed once per title and compared with signature_similarity.
+    """
+    signature = 0
+    for word in text.lower().split():
+        signature |= 1 << (zlib.crc32(word.encode()) & 63)
+    return signature
+
+
+def signature_similarity(signature1: int, signature2: int) -> float:
+    """
+    Approximate Jaccard similarity of two title signatures via popcount.
+    Bit collisions make it an estimate, so use it with some margin as a cheap
+    prefilter before calculate_similarity.
+    """
+    union = (signature1 | signature2).bit_count()
+    return (signature1 & signature2).bit_count() / union if union else 0.0
+
+
+def find_similar_titles(titles: List[str], threshold: float = 0.8) -> List[Tuple[int, int]]:
+    """
+    Find pairs of near-duplicate titles (Jaccard similarity >= threshold).
+    
+    Uses prefix filtering so most pairs are never compared: with words ordered
+    rarest first, two sets reaching the threshold must share a word within their
+    first n - ceil(threshold * n) + 1 words. Only titles sharing such a prefix word
+    are verified, and titles are visited by word count so the m / n size bound
+    discards the rest.
+    
+    Args:
+        titles: Titles to compare
+        threshold: Minimum Jaccard similarity for a pair to count, in (0, 1]
+    
+    Returns:
+        Sorted index pairs (i, j) into titles, with i < j
+    """
+    word_sets = [frozenset(title.lower().split()) for title in titles]
+    frequency = Counter(word for words in word_sets for word in words)
+    order = sorted((i for i in range(len(titles)) if word_sets[i]), key=lambda i: len(word_sets[i]))
+    
+    prefix_index: Dict[str, List[int]] = {}
+    pairs = []
+    for i in order:
+        words_i = word_sets[i]
+        size_i = len(words_i)
+        prefix_len = size_i - math.ceil(threshold * size_i - 1e-9) + 1
+        
+        candidates = set()
+        for word in sorted(words_i, key=lambda w: (frequency[w], w))[:prefix_len]:
+            indexed = prefix_index.setdefault(word, [])
+            candidates.update(indexed)
+            indexed.append(i)
+        
+        # Earlier titles are never longer, so only the lower size bound applies
+        min_size = threshold * size_i
+        for j in candidates:
+            words_j = word_sets[j]
+            size_j = len(words_j)
+            if size_j < min_size:
+                continue
+            intersection = len(words_i & words_j)
+            if intersection / (size_i + size_j - intersection) >= threshold:
+                pairs.append((min(i, j), max(i, j)))
     
-    return len(intersection) / len(union) if union else 0.0
+    pairs.sort()
+    return pairs
 
 
 # Global instances
-rate_limiter = RateLimiter()
+rate_limiter = TokenBucketLimiter()
 scrape_cache = LRUCache(max_size=50, ttl_seconds=1800)  # 30 min cache
 circuit_breaker = CircuitBreaker()
@@ -9,6 +9,9 @@ let filteredJobs = [];
 let currentPage = 1;
 const perPage = 20;
 
+// Job fields the dashboard renders; the API projects to these
+const JOB_LIST_FIELDS = 'title,url,company_name,location,posted_date,found_at,status';
+
 // Filters
 let filters = {
     company: '',
@@ -165,7 +168,7 @@ function renderTargets() {
 // Jobs
 async function loadJobs() {
     try {
-        const res = await fetch(`${API}/api/jobs?limit=500`);
+        const res = await fetch(`${API}/api/jobs?limit=500&fields=${JOB_LIST_FIELDS}`);
         jobs = await res.json();
         applyFilters();
         updateStats();
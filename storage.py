@@ -2,24 +2,62 @@
 Firestore storage operations with professional patterns.
 Includes caching, batching, and proper error handling.
 """
+import time
 import hashlib
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Any, Iterator, Tuple
 from functools import lru_cache
+from urllib.parse import urlsplit
 from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists, NotFound
 
-from config import db
-from models import JobStatus
+from config import db, settings
+from models import JobStatus, STATUS_NEW
 
 logger = logging.getLogger(__name__)
 
+# Hot-path constants
+_SERVER_TIMESTAMP = firestore.SERVER_TIMESTAMP
+_CODE_ALREADY_EXISTS = 6  # google.rpc.Code.ALREADY_EXISTS, as reported by BulkWriter failures
+
+# Query parameters that only track the click source, ignored when fingerprinting job content
+_TRACKING_PARAMS = frozenset({'gh_src', 'lever-source', 'lever-origin', 'source', 'src', 'ref'})
+_UNKNOWN_LOCATIONS = frozenset({'', 'not specified'})
+
+
+def _is_tracking_param(param: str) -> bool:
+    """Whether a raw 'name=value' query parameter is click tracking (utm_* and friends)."""
+    name = param.split('=', 1)[0]
+    return name.startswith('utm_') or name in _TRACKING_PARAMS
+
+
+@lru_cache(maxsize=1)
+def _utc_midnight_for_minute(minute: int) -> datetime:
+    """UTC midnight of the day containing the given epoch minute."""
+    return datetime.fromtimestamp(minute * 60, tz=timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def utc_midnight() -> datetime:
+    """Start of the current UTC day (timezone-aware), recomputed at most once a minute."""
+    return _utc_midnight_for_minute(int(time.time()) // 60)
+
 
 class StorageError(Exception):
     """Custom exception for storage operations."""
     pass
 
 
+class BulkSaveError(StorageError):
+    """Some writes of a bulk save failed; the jobs in created_ids were still created."""
+    
+    def __init__(self, message: str, created_ids: set):
+        super().__init__(message)
+        self.created_ids = created_ids
+
+
 class JobStorage:
     """
     Handles all job-related storage operations.
@@ -27,40 +65,250 @@ class JobStorage:
     """
     
     COLLECTION = 'job_history'
+    BULK_MAX_ATTEMPTS = 5
+    SEEN_LOOKUP_CHUNK = 100  # document refs per get_all round trip
+    SEEN_LOOKUP_WORKERS = 8  # concurrent get_all calls
+    CONTENT_FP_CHUNK = 30  # Firestore 'in' filter limit
+    STATS_CACHE_TTL = 60.0  # seconds
+    SEEN_CACHE_RETRY_SECONDS = 60.0  # wait after a failed seen-cache load before streaming again
     
     def __init__(self, db_client=None):
         self._db = db_client or db
+        self._collection = self._db.collection(self.COLLECTION)
+        # Seen job IDs as ints (see _seen_key) - roughly half the memory of 32-char hex strings
         self._seen_cache: set = set()
         self._cache_loaded = False
+        self._cache_retry_at = 0.0  # monotonic time before which a failed load is not retried
+        self._cache_lock = threading.Lock()
+        self._cache_stop = threading.Event()  # set on shutdown to abandon an in-flight load
+        self._stats_cache: Optional[tuple] = None  # (computed_at, stats)
+        ttl_days = settings.JOB_HISTORY_TTL_DAYS
+        self._history_ttl: Optional[timedelta] = timedelta(days=ttl_days) if ttl_days > 0 else None
     
     @staticmethod
-    def _get_url_hash(url: str) -> str:
-        """Generate consistent hash for URL-based document ID."""
-        normalized = url.lower().strip().rstrip('/')
-        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:32]
+    @lru_cache(maxsize=8192)
+    def _get_url_hash(url: str, _sha256=hashlib.sha256) -> str:
+        """
+        Generate consistent hash for URL-based document ID.
+        Memoized: each URL is checked against history and then saved, so it is hashed twice per run.
+        """
+        return _sha256(url.lower().strip().rstrip('/').encode('utf-8')).hexdigest()[:32]
+    
+    def job_id_for_url(self, url: str) -> str:
+        """Document ID a job with this URL is stored under."""
+        return self._get_url_hash(url)
+    
+    @classmethod
+    def _hash_urls_batch(cls, urls: List[str]) -> List[str]:
+        """Hash many URLs in one pass through the memoized _get_url_hash."""
+        url_hash = cls._get_url_hash
+        return [url_hash(url) for url in urls]
+    
+    @staticmethod
+    def _seen_key(job_id: str):
+        """Compact seen-cache key for a document ID: the hex hash as an int (other IDs kept as-is)."""
+        try:
+            return int(job_id, 16)
+        except ValueError:
+            return job_id
     
     def _load_seen_cache(self):
-        """Load all seen job URLs into memory for fast lookup."""
-        if self._cache_loaded:
+        """
+        Load all seen job URLs into memory for fast lookup.
+        After a failure the load is retried at most every SEEN_CACHE_RETRY_SECONDS; IDs
+        already in the set (saves, get_all hits) are kept either way.
+        """
+        if self._cache_loaded or time.monotonic() < self._cache_retry_at:
             return
         
-        try:
-            docs = self._db.collection(self.COLLECTION).select([]).stream()
-            self._seen_cache = {doc.id for doc in docs}
+        # Concurrent callers wait for a single load instead of each streaming the collection
+        with self._cache_lock:
+            if self._cache_loaded or time.monotonic() < self._cache_retry_at:
+                return
+            
+            try:
+                seen_key = self._seen_key
+                stop = self._cache_stop
+                loaded = set()
+                for doc in self._collection.select([]).stream():
+                    if stop.is_set():
+                        logger.info("Seen cache load stopped")
+                        return
+                    loaded.add(seen_key(doc.id))
+            except Exception as e:
+                logger.error(f"Failed to load seen cache: {e}")
+                self._cache_retry_at = time.monotonic() + self.SEEN_CACHE_RETRY_SECONDS
+                return
+            
+            # Merge rather than replace, so IDs added while the stream ran are not lost
+            self._seen_cache.update(loaded)
             self._cache_loaded = True
-            logger.info(f"Loaded {len(self._seen_cache)} job IDs into cache")
-        except Exception as e:
-            logger.error(f"Failed to load seen cache: {e}")
-            self._seen_cache = set()
+            logger.info(f"Loaded {len(loaded)} job IDs into cache")
+    
+    @staticmethod
+    def _content_fingerprint(job_data: Dict, _sha256=hashlib.sha256) -> Optional[str]:
+        """
+        Hash of company, title, location and the posting URL without tracking parameters.
+        
+        Reposts that differ only in scheme, tracking or parameter order share it, while
+        separate openings with the same title keep distinct paths or req-id parameters.
+        Jobs without a title, URL or known location get None and are never merged.
+        """
+        title = job_data.get('title')
+        url = job_data.get('url')
+        location = ' '.join(str(job_data.get('location') or '').split()).lower()
+        if not title or not url or location in _UNKNOWN_LOCATIONS:
+            return None
+        
+        parts = urlsplit(url.strip().lower())
+        params = sorted(param for param in parts.query.split('&') if param and not _is_tracking_param(param))
+        key = '|'.join((
+            ' '.join(str(job_data.get('company_name') or '').split()).lower(),
+            ' '.join(title.split()).lower(),
+            location,
+            parts.netloc + parts.path.rstrip('/'),
+            '&'.join(params)
+        ))
+        return _sha256(key.encode('utf-8')).hexdigest()[:32]
+    
+    def _new_job_data(self, job_data: Dict, found_at: datetime) -> Dict:
+        """Document for a newly found job, with expire_at set when history retention is enabled."""
+        data_to_save = {
+            **job_data,
+            'found_at': found_at,
+            'status': job_data.get('status', STATUS_NEW),
+            'updated_at': found_at
+        }
+        content_fp = self._content_fingerprint(job_data)
+        if content_fp:
+            data_to_save['content_fp'] = content_fp
+        if self._history_ttl:
+            data_to_save['expire_at'] = found_at + self._history_ttl
+        return data_to_save
+    
+    def preload_seen_cache(self):
+        """Load the seen-job cache ahead of the first lookup (e.g. at startup)."""
+        self._load_seen_cache()
+    
+    def stop_seen_cache_load(self):
+        """Make an in-flight seen-cache load return early (e.g. on shutdown)."""
+        self._cache_stop.set()
     
     def is_job_seen(self, job_url: str) -> bool:
         """
         Check if a job URL has already been processed.
         Uses in-memory cache for performance.
         """
+        return bool(self.get_seen_urls([job_url]))
+    
+    def get_seen_urls(self, job_urls: List[str]) -> set:
+        """
+        Check a batch of job URLs in one pass.
+        
+        Args:
+            job_urls: Candidate job URLs
+        
+        Returns:
+            Set of the given URLs that have already been processed
+        """
         self._load_seen_cache()
-        job_hash = self._get_url_hash(job_url)
-        return job_hash in self._seen_cache
+        hashes = self._hash_urls_batch(job_urls)
+        seen_cache = self._seen_cache
+        seen_key = self._seen_key
+        
+        if not self._cache_loaded:
+            # Cache not loaded: ask Firestore rather than report every URL as new,
+            # remembering hits so they are not read again while the cache is down
+            unknown = list({job_hash for job_hash in hashes if seen_key(job_hash) not in seen_cache})
+            if unknown:
+                seen_cache.update(map(seen_key, self._fetch_existing_ids(unknown)))
+        
+        return {url for url, job_hash in zip(job_urls, hashes) if seen_key(job_hash) in seen_cache}
+    
+    def _fetch_existing_ids(self, job_ids: List[str]) -> set:
+        """
+        Check which job document IDs exist, SEEN_LOOKUP_CHUNK per get_all round trip,
+        with up to SEEN_LOOKUP_WORKERS round trips in flight.
+        
+        Raises:
+            StorageError: If the lookup fails
+        """
+        collection = self._collection
+        chunk = self.SEEN_LOOKUP_CHUNK
+        ref_chunks = [
+            [collection.document(job_id) for job_id in job_ids[start:start + chunk]]
+            for start in range(0, len(job_ids), chunk)
+        ]
+        
+        def existing_in(refs) -> List[str]:
+            # Only existence matters, so fetch a single small field per document
+            return [snap.id for snap in self._db.get_all(refs, field_paths=['status']) if snap.exists]
+        
+        existing = set()
+        try:
+            if len(ref_chunks) == 1:
+                existing.update(existing_in(ref_chunks[0]))
+            else:
+                # Chunks are independent RPCs on the shared gRPC channel, so overlap them
+                workers = min(self.SEEN_LOOKUP_WORKERS, len(ref_chunks))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    for ids in executor.map(existing_in, ref_chunks):
+                        existing.update(ids)
+        except Exception as e:
+            logger.error(f"Failed to check seen jobs: {e}")
+            raise StorageError(f"Failed to check seen jobs: {e}")
+        
+        return existing
+    
+    def drop_content_duplicates(self, jobs: List[Dict]) -> List[Dict]:
+        """
+        Drop reposts: jobs whose content fingerprint (see _content_fingerprint) matches
+        an earlier job in the list or one already stored, under a different URL.
+        
+        A stored match is recorded on that document (last_seen, alternate_urls) rather
+        than discarded silently. Stored matches come from content_fp 'in' queries,
+        CONTENT_FP_CHUNK fingerprints per round trip; if those fail, only duplicates
+        within the list are dropped.
+        
+        Args:
+            jobs: Candidate new jobs
+        
+        Returns:
+            The jobs to keep, in their original order
+        """
+        unique = {}
+        for index, job_data in enumerate(jobs):
+            # Jobs that can't be fingerprinted are keyed by position and always kept
+            key = self._content_fingerprint(job_data) or index
+            kept = unique.setdefault(key, job_data)
+            if kept is not job_data:
+                logger.info(f"Skipping repost of {job_data.get('title')}: {job_data['url']} duplicates {kept['url']}")
+        
+        fingerprints = [key for key in unique if isinstance(key, str)]
+        chunk = self.CONTENT_FP_CHUNK
+        now = datetime.now(timezone.utc)
+        try:
+            for start in range(0, len(fingerprints), chunk):
+                query = self._collection.where('content_fp', 'in', fingerprints[start:start + chunk])
+                batch = None
+                for doc in query.select(['content_fp']).stream():
+                    job_data = unique.pop(doc.to_dict().get('content_fp'), None)
+                    if job_data is None:
+                        continue
+                    logger.info(f"Skipping repost of {job_data.get('title')}: {job_data['url']} matches job {doc.id}")
+                    batch = batch or self._db.batch()
+                    batch.update(self._collection.document(doc.id), {
+                        'last_seen': now,
+                        'alternate_urls': firestore.ArrayUnion([job_data['url']])
+                    })
+                if batch:
+                    batch.commit()
+        except Exception as e:
+            logger.warning(f"Content fingerprint check failed, keeping URL-unique jobs: {e}")
+        
+        if len(unique) < len(jobs):
+            logger.info(f"Dropped {len(jobs) - len(unique)} jobs already known under another URL")
+        return list(unique.values())
     
     def save_job(self, job_data: Dict) -> str:
         """
@@ -80,26 +328,59 @@ class JobStorage:
         
         job_hash = self._get_url_hash(job_data['url'])
         
-        # Prepare data for storage
-        data_to_save = {
-            **job_data,
-            'found_at': firestore.SERVER_TIMESTAMP,
-            'status': job_data.get('status', JobStatus.NEW.value),
-            'updated_at': firestore.SERVER_TIMESTAMP
-        }
+        # Prepare data for storage; a client timestamp spares the server-side transform
+        found_at = datetime.now(timezone.utc)
+        data_to_save = self._new_job_data(job_data, found_at)
         
         try:
-            self._db.collection(self.COLLECTION).document(job_hash).set(data_to_save)
-            self._seen_cache.add(job_hash)
+            self._collection.document(job_hash).set(data_to_save)
+            self._seen_cache.add(self._seen_key(job_hash))
+            self._stats_cache = None
             logger.debug(f"Saved job: {job_data.get('title', 'Unknown')}")
             return job_hash
         except Exception as e:
             logger.error(f"Failed to save job: {e}")
             raise StorageError(f"Failed to save job: {e}")
     
+    def try_save_job(self, job_data: Dict) -> bool:
+        """
+        Save a job only if it is not stored yet, in a single create() round trip.
+        An existing job keeps its status and notes instead of being overwritten.
+        
+        Args:
+            job_data: Job dictionary with required 'url' field
+        
+        Returns:
+            True if the job was created, False if it already existed
+        
+        Raises:
+            StorageError: If job_data is invalid or save fails
+        """
+        if 'url' not in job_data:
+            raise StorageError("Job data must contain a 'url' field")
+        
+        job_hash = self._get_url_hash(job_data['url'])
+        found_at = datetime.now(timezone.utc)
+        data_to_save = self._new_job_data(job_data, found_at)
+        
+        try:
+            self._collection.document(job_hash).create(data_to_save)
+        except AlreadyExists:
+            self._seen_cache.add(self._seen_key(job_hash))
+            return False
+        except Exception as e:
+            logger.error(f"Failed to save job: {e}")
+            raise StorageError(f"Failed to save job: {e}")
+        
+        self._seen_cache.add(self._seen_key(job_hash))
+        self._stats_cache = None
+        logger.debug(f"Saved job: {job_data.get('title', 'Unknown')}")
+        return True
+    
     def save_jobs_batch(self, jobs: List[Dict]) -> int:
         """
         Save multiple jobs in a batch operation for efficiency.
+        Jobs whose URL is already stored are skipped rather than rewritten.
         
         Args:
             jobs: List of job dictionaries
@@ -110,42 +391,153 @@ class JobStorage:
         if not jobs:
             return 0
         
+        self._load_seen_cache()
+        jobs = [job_data for job_data in jobs if 'url' in job_data]
+        job_hashes = self._hash_urls_batch([job_data['url'] for job_data in jobs])
+        collection = self._collection
         batch = self._db.batch()
         saved_count = 0
+        pending_keys = set()
+        found_at = datetime.now(timezone.utc)
         
-        for job_data in jobs:
-            if 'url' not in job_data:
+        def commit_pending():
+            # Only committed jobs count as seen, so a failed commit can be retried later
+            nonlocal saved_count
+            batch.commit()
+            self._seen_cache.update(pending_keys)
+            self._stats_cache = None
+            saved_count += len(pending_keys)
+            pending_keys.clear()
+        
+        for job_data, job_hash in zip(jobs, job_hashes):
+            # Skip jobs already stored (or already queued in this batch)
+            seen_key = self._seen_key(job_hash)
+            if seen_key in self._seen_cache or seen_key in pending_keys:
                 continue
             
-            job_hash = self._get_url_hash(job_data['url'])
-            doc_ref = self._db.collection(self.COLLECTION).document(job_hash)
-            
-            data_to_save = {
-                **job_data,
-                'found_at': firestore.SERVER_TIMESTAMP,
-                'status': job_data.get('status', JobStatus.NEW.value),
-                'updated_at': firestore.SERVER_TIMESTAMP
-            }
+            data_to_save = self._new_job_data(job_data, found_at)
             
-            batch.set(doc_ref, data_to_save)
-            self._seen_cache.add(job_hash)
-            saved_count += 1
+            batch.set(collection.document(job_hash), data_to_save)
+            pending_keys.add(seen_key)
             
             # Firestore batch limit is 500 operations
-            if saved_count % 450 == 0:
-                batch.commit()
+            if len(pending_keys) == 450:
+                commit_pending()
                 batch = self._db.batch()
         
-        if saved_count % 450 != 0:
-            batch.commit()
+        if pending_keys:
+            commit_pending()
         
         logger.info(f"Batch saved {saved_count} jobs")
         return saved_count
     
+    def save_jobs_bulk(self, jobs: List[Dict], digest_pending: bool = False) -> set:
+        """
+        Save multiple jobs with a Firestore BulkWriter.
+        Commits run in parallel with built-in rate ramp-up and retry, which scales
+        better than sequential batch commits for large result sets. Jobs are
+        created rather than set, so one already stored (e.g. by another instance)
+        keeps its status and notes and is not returned.
+        
+        Args:
+            jobs: List of job dictionaries
+            digest_pending: Flag the jobs as waiting for the next notification digest
+        
+        Returns:
+            Document IDs of the jobs newly created (see job_id_for_url)
+        
+        Raises:
+            BulkSaveError: If any write still fails after retrying; carries the IDs
+                that were created anyway
+        """
+        if not jobs:
+            return set()
+        
+        collection = self._collection
+        saved_ids = []
+        existing_ids = []
+        failures = []
+        
+        def on_write_result(doc_ref, _result, _writer):
+            saved_ids.append(doc_ref.id)
+        
+        def on_write_error(failure, _writer) -> bool:
+            if failure.code == _CODE_ALREADY_EXISTS:
+                existing_ids.append(failure.operation.reference.id)
+                return False
+            if failure.attempts < self.BULK_MAX_ATTEMPTS:
+                return True
+            failures.append(failure)
+            return False
+        
+        # One write per document: the same URL found by two targets is only queued once
+        jobs = [job_data for job_data in jobs if 'url' in job_data]
+        jobs_by_hash = {}
+        for job_hash, job_data in zip(self._hash_urls_batch([job_data['url'] for job_data in jobs]), jobs):
+            jobs_by_hash.setdefault(job_hash, job_data)
+        
+        bulk_writer = self._db.bulk_writer()
+        bulk_writer.on_write_result(on_write_result)
+        bulk_writer.on_write_error(on_write_error)
+        
+        found_at = datetime.now(timezone.utc)
+        for job_hash, job_data in jobs_by_hash.items():
+            data_to_save = self._new_job_data(job_data, found_at)
+            if digest_pending:
+                data_to_save['digest_pending'] = True
+            bulk_writer.create(collection.document(job_hash), data_to_save)
+        
+        # Flush remaining writes and wait for every callback
+        bulk_writer.close()
+        self._seen_cache.update(map(self._seen_key, saved_ids))
+        self._seen_cache.update(map(self._seen_key, existing_ids))
+        self._stats_cache = None
+        
+        logger.info(f"Bulk saved {len(saved_ids)} jobs")
+        if failures:
+            logger.error(f"Failed to save {len(failures)} jobs: {failures[0].message}")
+            raise BulkSaveError(f"Failed to save {len(failures)} of {len(jobs)} jobs", set(saved_ids))
+        return set(saved_ids)
+    
+    def get_digest_pending_jobs(self, limit: int = 500) -> List[Dict]:
+        """
+        Get jobs saved with digest_pending that have not been notified yet.
+        The flag lives on the job document, so pending digests survive instance restarts.
+        """
+        query = self._collection.where('digest_pending', '==', True).limit(limit)
+        return list(self._iter_docs(query))
+    
+    def clear_digest_pending(self, job_ids: List[str]) -> int:
+        """
+        Remove the digest_pending flag from jobs once their digest was sent.
+        
+        Returns:
+            Number of jobs cleared
+        
+        Raises:
+            StorageError: If a commit fails
+        """
+        collection = self._collection
+        cleared = 0
+        
+        try:
+            # Firestore batch limit is 500 operations
+            for start in range(0, len(job_ids), 450):
+                batch = self._db.batch()
+                chunk = job_ids[start:start + 450]
+                for job_id in chunk:
+                    batch.update(collection.document(job_id), {'digest_pending': firestore.DELETE_FIELD})
+                batch.commit()
+                cleared += len(chunk)
+        except Exception as e:
+            logger.error(f"Failed to clear digest flag after {cleared} jobs: {e}")
+            raise StorageError(f"Failed to clear digest flag: {e}")
+        return cleared
+    
     def get_job(self, job_id: str) -> Optional[Dict]:
         """Get a single job by ID."""
         try:
-            doc = self._db.collection(self.COLLECTION).document(job_id).get()
+            doc = self._collection.document(job_id).get()
             if doc.exists:
                 return {"id": doc.id, **doc.to_dict()}
             return None
@@ -159,53 +551,84 @@ class JobStorage:
         offset: int = 0,
         company: str = None,
         status: str = None,
-        since: datetime = None
+        since: datetime = None,
+        cursor: str = None,
+        fields: List[str] = None
     ) -> List[Dict]:
         """
         Get jobs with filtering and pagination.
         
         Args:
             limit: Maximum number of jobs to return
-            offset: Number of jobs to skip
+            offset: Number of jobs to skip (prefer cursor; skipped docs are still read)
             company: Filter by company name
             status: Filter by job status
             since: Only return jobs found after this datetime
+            cursor: ID of the last job on the previous page; results start after it
+            fields: Only return these fields (plus 'id'); all fields if omitted
         
         Returns:
             List of job dictionaries
         """
         try:
-            query = self._db.collection(self.COLLECTION)
-            
-            # Apply filters
-            if company:
-                query = query.where('company_name', '==', company)
-            if status:
-                query = query.where('status', '==', status)
-            if since:
-                query = query.where('found_at', '>=', since)
-            
-            # Order and paginate
-            query = query.order_by('found_at', direction=firestore.Query.DESCENDING)
-            
-            # Firestore doesn't support offset natively, we have to fetch and skip
-            docs = query.limit(limit + offset).stream()
-            
-            jobs = []
-            for i, doc in enumerate(docs):
-                if i < offset:
-                    continue
-                if len(jobs) >= limit:
-                    break
-                data = doc.to_dict()
-                data['id'] = doc.id
-                jobs.append(data)
-            
-            return jobs
+            return list(self.stream_jobs(limit, offset, company, status, since, cursor, fields))
+        except StorageError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get jobs: {e}")
             return []
     
+    def stream_jobs(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        company: str = None,
+        status: str = None,
+        since: datetime = None,
+        cursor: str = None,
+        fields: List[str] = None
+    ) -> Iterator[Dict]:
+        """
+        Iterate over jobs as Firestore streams them, without building a list.
+        
+        Takes the same arguments as get_jobs. The query is built eagerly, so an
+        invalid cursor raises StorageError here rather than mid-iteration.
+        """
+        collection = self._collection
+        query = collection
+        
+        # Apply filters
+        if company:
+            query = query.where('company_name', '==', company)
+        if status:
+            query = query.where('status', '==', status)
+        if since:
+            query = query.where('found_at', '>=', since)
+        
+        # Order and paginate
+        query = query.order_by('found_at', direction=firestore.Query.DESCENDING)
+        
+        if cursor:
+            # Resume after the cursor document so read cost stays O(limit) at any depth
+            cursor_doc = collection.document(cursor).get()
+            if not cursor_doc.exists:
+                raise StorageError(f"Invalid cursor: {cursor}")
+            query = query.start_after(cursor_doc)
+        if offset:
+            query = query.offset(offset)
+        if fields:
+            query = query.select(fields)
+        
+        return self._iter_docs(query.limit(limit))
+    
+    @staticmethod
+    def _iter_docs(query) -> Iterator[Dict]:
+        """Yield query results as dictionaries with their document ID."""
+        for doc in query.stream():
+            data = doc.to_dict()
+            data['id'] = doc.id
+            yield data
+    
     def update_job_status(
         self,
         job_id: str,
@@ -223,14 +646,17 @@ class JobStorage:
             referral_contact: Optional referral contact
         
         Returns:
-            True if successful, False otherwise
+            True if updated, False if the job does not exist
+        
+        Raises:
+            StorageError: If the update fails for any other reason
         """
         try:
-            doc_ref = self._db.collection(self.COLLECTION).document(job_id)
+            doc_ref = self._collection.document(job_id)
             
             update_data = {
                 'status': status.value,
-                'updated_at': firestore.SERVER_TIMESTAMP
+                'updated_at': _SERVER_TIMESTAMP
             }
             
             if notes is not None:
@@ -238,94 +664,243 @@ class JobStorage:
             if referral_contact is not None:
                 update_data['referral_contact'] = referral_contact
             
+            # update() fails with NotFound on a missing document, so no existence read is needed
             doc_ref.update(update_data)
+            self._stats_cache = None
             logger.info(f"Updated job {job_id} status to {status.value}")
             return True
+        except NotFound:
+            return False
         except Exception as e:
             logger.error(f"Failed to update job status: {e}")
-            return False
+            raise StorageError(f"Failed to update job status: {e}")
+    
+    def update_jobs_batch(self, updates: List[Tuple[str, JobStatus, Optional[str]]]) -> int:
+        """
+        Update the status (and optional notes) of many jobs with batched commits.
+        
+        Args:
+            updates: (job_id, status, notes) tuples; notes may be None to leave them unchanged
+        
+        Returns:
+            Number of jobs updated
+        
+        Raises:
+            StorageError: If a commit fails (e.g. one of its jobs does not exist)
+        """
+        if not updates:
+            return 0
+        
+        collection = self._collection
+        batch = self._db.batch()
+        updated_count = 0
+        pending = 0
+        
+        try:
+            for job_id, status, notes in updates:
+                update_data = {
+                    'status': status.value,
+                    'updated_at': _SERVER_TIMESTAMP
+                }
+                if notes is not None:
+                    update_data['notes'] = notes
+                
+                batch.update(collection.document(job_id), update_data)
+                pending += 1
+                
+                # Firestore batch limit is 500 operations
+                if pending == 450:
+                    batch.commit()
+                    updated_count += pending
+                    batch = self._db.batch()
+                    pending = 0
+            
+            if pending:
+                batch.commit()
+                updated_count += pending
+        except Exception as e:
+            logger.error(f"Failed to batch update jobs after {updated_count} updates: {e}")
+            raise StorageError(f"Failed to update jobs: {e}")
+        finally:
+            if updated_count:
+                self._stats_cache = None
+        
+        logger.info(f"Batch updated {updated_count} jobs")
+        return updated_count
     
     def delete_job(self, job_id: str) -> bool:
         """Delete a job by ID."""
         try:
-            doc_ref = self._db.collection(self.COLLECTION).document(job_id)
-            if not doc_ref.get().exists:
-                return False
-            
-            doc_ref.delete()
-            self._seen_cache.discard(job_id)
+            doc_ref = self._collection.document(job_id)
+            # Precondition makes delete() raise NotFound instead of silently succeeding
+            doc_ref.delete(option=self._db.write_option(exists=True))
+            self._seen_cache.discard(self._seen_key(job_id))
+            self._stats_cache = None
             logger.info(f"Deleted job {job_id}")
             return True
+        except NotFound:
+            return False
         except Exception as e:
             logger.error(f"Failed to delete job: {e}")
             return False
     
     def get_stats(self) -> Dict[str, Any]:
-        """Get job statistics for dashboard."""
+        """
+        Get job statistics for dashboard.
+        Results are cached in-process for STATS_CACHE_TTL seconds and dropped on any job write.
+        """
+        cached = self._stats_cache
+        if cached and time.monotonic() - cached[0] < self.STATS_CACHE_TTL:
+            return dict(cached[1])
+        
         try:
-            # Get total count
-            all_jobs = list(self._db.collection(self.COLLECTION).stream())
-            total = len(all_jobs)
-            
-            # Calculate stats
-            today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            new_today = 0
-            by_company = {}
-            by_status = {}
-            
-            for doc in all_jobs:
-                data = doc.to_dict()
-                
-                # Count new today
-                found_at = data.get('found_at')
-                if found_at:
-                    if hasattr(found_at, 'timestamp'):
-                        found_dt = datetime.fromtimestamp(found_at.timestamp())
-                    else:
-                        found_dt = found_at
-                    if found_dt >= today:
-                        new_today += 1
-                
-                # Count by company
-                company = data.get('company_name', 'Unknown')
-                by_company[company] = by_company.get(company, 0) + 1
-                
-                # Count by status
-                status = data.get('status', 'new')
-                by_status[status] = by_status.get(status, 0) + 1
-            
-            return {
-                'total_jobs': total,
-                'new_today': new_today,
-                'jobs_by_company': by_company,
-                'jobs_by_status': by_status
-            }
+            stats = self._compute_stats()
         except Exception as e:
             logger.error(f"Failed to get stats: {e}")
             return {'total_jobs': 0, 'new_today': 0, 'jobs_by_company': {}, 'jobs_by_status': {}}
+        
+        self._stats_cache = (time.monotonic(), stats)
+        return dict(stats)
+    
+    def _compute_stats(self) -> Dict[str, Any]:
+        """Count jobs using a server-side aggregation for new_today, falling back to a local count."""
+        collection = self._collection
+        today = utc_midnight()
+        
+        try:
+            new_today = collection.where('found_at', '>=', today).count().get()[0][0].value
+        except Exception as e:
+            logger.warning(f"Aggregation query unavailable, counting locally: {e}")
+            return self._compute_stats_locally(today)
+        
+        # Breakdowns only need two small fields per job, not the full document
+        by_company = {}
+        by_status = {}
+        total = 0
+        for doc in collection.select(['company_name', 'status']).stream():
+            data = doc.to_dict()
+            company = data.get('company_name', 'Unknown')
+            by_company[company] = by_company.get(company, 0) + 1
+            status = data.get('status', 'new')
+            by_status[status] = by_status.get(status, 0) + 1
+            total += 1
+        
+        return {
+            'total_jobs': total,
+            'new_today': new_today,
+            'jobs_by_company': by_company,
+            'jobs_by_status': by_status
+        }
+    
+    def _compute_stats_locally(self, today: datetime) -> Dict[str, Any]:
+        """Compute every stat from a single projected stream of the collection."""
+        docs = self._collection.select(['company_name', 'status', 'found_at']).stream()
+        # Firestore returns aware UTC datetimes, so compare epoch seconds instead of rebuilding datetimes
+        today_seconds = today.timestamp()
+        
+        total = 0
+        new_today = 0
+        by_company = {}
+        by_status = {}
+        
+        for doc in docs:
+            data = doc.to_dict()
+            total += 1
+            
+            # Count new today
+            found_at = data.get('found_at')
+            if found_at and found_at.timestamp() >= today_seconds:
+                new_today += 1
+            
+            # Count by company
+            company = data.get('company_name', 'Unknown')
+            by_company[company] = by_company.get(company, 0) + 1
+            
+            # Count by status
+            status = data.get('status', 'new')
+            by_status[status] = by_status.get(status, 0) + 1
+        
+        return {
+            'total_jobs': total,
+            'new_today': new_today,
+            'jobs_by_company': by_company,
+            'jobs_by_status': by_status
+        }
 
 
 class TargetStorage:
     """Handles all target-related storage operations."""
     
     COLLECTION = 'targets'
+    ACTIVE_CACHE_TTL = 60.0  # seconds
+    # Target fields the scraper reads; active targets are fetched as this projection
+    SCRAPE_FIELDS = ['company_name', 'careers_url', 'role_keyword', 'exclude_keywords', 'include_locations']
     
     def __init__(self, db_client=None):
         self._db = db_client or db
+        self._collection = self._db.collection(self.COLLECTION)
+        self._active_cache: Optional[tuple] = None  # (fetched_at, targets)
+        self._active_lock = threading.Lock()
+    
+    def _invalidate_active_cache(self):
+        """Drop cached active targets after a write."""
+        self._active_cache = None
     
     def get_active_targets(self) -> List[Dict]:
-        """Get all active targets."""
-        try:
-            docs = self._db.collection(self.COLLECTION).where('active', '==', True).stream()
-            return [{"id": doc.id, **doc.to_dict()} for doc in docs]
-        except Exception as e:
-            logger.error(f"Failed to get active targets: {e}")
-            return []
+        """
+        Get all active targets.
+        Results are cached in-process for ACTIVE_CACHE_TTL seconds and dropped on any target write.
+        """
+        cached = self._active_cache
+        if cached and time.monotonic() - cached[0] < self.ACTIVE_CACHE_TTL:
+            return list(cached[1])
+        
+        # Only one caller refreshes; the rest wait and reuse its result
+        with self._active_lock:
+            cached = self._active_cache
+            if cached and time.monotonic() - cached[0] < self.ACTIVE_CACHE_TTL:
+                return list(cached[1])
+            
+            try:
+                targets = list(self.iter_active_targets())
+            except Exception as e:
+                logger.error(f"Failed to get active targets: {e}")
+                return []
+            
+            self._active_cache = (time.monotonic(), targets)
+            return list(targets)
+    
+    def iter_active_targets(self, page_size: int = 200) -> Iterator[Dict]:
+        """
+        Yield active targets as Firestore streams them, bypassing the cache.
+        Pages of page_size are fetched with start_after cursors (never offset), so
+        memory and each query's reads stay bounded as the collection grows.
+        Only SCRAPE_FIELDS are transferred.
+        """
+        query = (
+            self._collection.where('active', '==', True)
+            .select(self.SCRAPE_FIELDS)
+            .order_by('__name__')
+        )
+        last_doc = None
+        
+        while True:
+            page = query.start_after(last_doc) if last_doc else query
+            docs = list(page.limit(page_size).stream())
+            for doc in docs:
+                yield {"id": doc.id, **doc.to_dict()}
+            
+            if len(docs) < page_size:
+                return
+            last_doc = docs[-1]
     
-    def get_all_targets(self) -> List[Dict]:
-        """Get all targets regardless of status."""
+    def get_all_targets(self, fields: List[str] = None) -> List[Dict]:
+        """Get all targets regardless of status, optionally projected to the given fields."""
         try:
-            docs = self._db.collection(self.COLLECTION).stream()
+            query = self._collection
+            if fields:
+                query = query.select(fields)
+            docs = query.stream()
             return [{"id": doc.id, **doc.to_dict()} for doc in docs]
         except Exception as e:
             logger.error(f"Failed to get all targets: {e}")
@@ -334,7 +909,7 @@ class TargetStorage:
     def get_target(self, target_id: str) -> Optional[Dict]:
         """Get a single target by ID."""
         try:
-            doc = self._db.collection(self.COLLECTION).document(target_id).get()
+            doc = self._collection.document(target_id).get()
             if doc.exists:
                 return {"id": doc.id, **doc.to_dict()}
             return None
@@ -350,10 +925,11 @@ class TargetStorage:
             Document ID of created target
         """
         try:
-            data['created_at'] = firestore.SERVER_TIMESTAMP
-            data['updated_at'] = firestore.SERVER_TIMESTAMP
-            doc_ref = self._db.collection(self.COLLECTION).add(data)
+            data['created_at'] = _SERVER_TIMESTAMP
+            data['updated_at'] = _SERVER_TIMESTAMP
+            doc_ref = self._collection.add(data)
             target_id = doc_ref[1].id
+            self._invalidate_active_cache()
             logger.info(f"Created target: {data.get('company_name')} ({target_id})")
             return target_id
         except Exception as e:
@@ -361,30 +937,39 @@ class TargetStorage:
             raise StorageError(f"Failed to create target: {e}")
     
     def update_target(self, target_id: str, data: Dict) -> bool:
-        """Update an existing target."""
+        """
+        Update an existing target.
+        
+        Returns:
+            True if updated, False if the target does not exist
+        
+        Raises:
+            StorageError: If the update fails for any other reason
+        """
         try:
-            doc_ref = self._db.collection(self.COLLECTION).document(target_id)
-            if not doc_ref.get().exists:
-                return False
-            
-            data['updated_at'] = firestore.SERVER_TIMESTAMP
-            doc_ref.update(data)
+            doc_ref = self._collection.document(target_id)
+            # update() fails with NotFound on a missing document, so no existence read is needed
+            doc_ref.update({**data, 'updated_at': _SERVER_TIMESTAMP})
+            self._invalidate_active_cache()
             logger.info(f"Updated target {target_id}")
             return True
+        except NotFound:
+            return False
         except Exception as e:
             logger.error(f"Failed to update target: {e}")
-            return False
+            raise StorageError(f"Failed to update target: {e}")
     
     def delete_target(self, target_id: str) -> bool:
         """Delete a target."""
         try:
-            doc_ref = self._db.collection(self.COLLECTION).document(target_id)
-            if not doc_ref.get().exists:
-                return False
-            
-            doc_ref.delete()
+            doc_ref = self._collection.document(target_id)
+            # Precondition makes delete() raise NotFound instead of silently succeeding
+            doc_ref.delete(option=self._db.write_option(exists=True))
+            self._invalidate_active_cache()
             logger.info(f"Deleted target {target_id}")
             return True
+        except NotFound:
+            return False
         except Exception as e:
             logger.error(f"Failed to delete target: {e}")
             return False
@@ -410,6 +995,11 @@ def is_job_seen(job_url: str) -> bool:
     return job_storage.is_job_seen(job_url)
 
 
+def get_seen_urls(job_urls: List[str]) -> set:
+    """Legacy wrapper for job_storage.get_seen_urls()."""
+    return job_storage.get_seen_urls(job_urls)
+
+
 def save_job(job_data: Dict) -> str:
     """Legacy wrapper for job_storage.save_job()."""
     return job_storage.save_job(job_data)